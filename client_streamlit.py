@@ -3,14 +3,17 @@ import anthropic
 import sqlite3
 import json
 import os
-import anyio
+import re
+import time
+import atexit
+import asyncio
+import threading
 import fastmcp
-from contextlib import closing
 from config.config_loader import load_mcp_config, MCP_CLIENT_CONFIG_PATH
 
-# Load configuration
+# Load configuration once per session; save_api_key keeps it up to date
 try:
-    config = load_mcp_config()
+    config = st.session_state.get("config") or load_mcp_config()
     required_keys = ["anthropicApiKey", "dbPath", "mcpServers"]
     if not all(key in config for key in required_keys):
         st.error(
@@ -23,91 +26,219 @@ try:
     ANTHROPIC_API_KEY = config["anthropicApiKey"]
     DB_PATH = config["dbPath"]
     SERVER_URL = config["mcpServers"]["master-server"]["url"]
+    st.session_state.config = config
 except Exception as e:
     st.error(f"Failed to load configuration: {str(e)}")
     st.stop()
 
+# Streaming responses are redrawn at most every RENDER_BATCH chunks or
+# RENDER_INTERVAL seconds, whichever comes first
+RENDER_BATCH = 8
+RENDER_INTERVAL = 0.05
+
+# Queries mentioning any of these route through the MCP servers; matched as
+# case-insensitive substrings with a single compiled pattern
+TOOL_KEYWORDS = ["select ", " from ", "file", "directory", "search files", "iam", "user",
+                 "group", "role", "policy", "access key", "cost", "email", "send", "read", "trash", "unread"]
+TOOL_KEYWORDS_RE = re.compile(
+    "|".join(re.escape(keyword) for keyword in TOOL_KEYWORDS), re.IGNORECASE)
+
 
 def save_api_key(api_key: str):
     """Save Anthropic API key to mcp_client_config.json with restricted permissions."""
     try:
-        config = load_mcp_config()
-        config["anthropicApiKey"] = api_key
-        with open(MCP_CLIENT_CONFIG_PATH, "w") as f:
-            json.dump(config, f, indent=2)
-        os.chmod(MCP_CLIENT_CONFIG_PATH, 0o600)
+        config = st.session_state.config
+        if config.get("anthropicApiKey") == api_key:
+            return True
+        updated = {**config, "anthropicApiKey": api_key}
+        # Write a 0600 temp file and atomically swap it in, so the key is
+        # never readable by others and a crash cannot leave a partial file
+        temp_path = f"{MCP_CLIENT_CONFIG_PATH}.{os.getpid()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(updated, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, MCP_CLIENT_CONFIG_PATH)
+        except Exception:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        st.session_state.config = updated
+        load_mcp_config.clear()
         return True
     except Exception as e:
         st.error(f"Failed to save API key: {str(e)}")
         return False
 
 
-def init_conversation_db():
-    """Initialize conversation database."""
-    with closing(sqlite3.connect(DB_PATH)) as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS conversation (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                role TEXT NOT NULL,
-                content TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
+def get_db_conn() -> sqlite3.Connection:
+    """Return the cached conversation database connection for this session."""
+    if "db_conn" not in st.session_state:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        init_conversation_db(conn)
+        atexit.register(conn.close)
+        st.session_state.db_conn = conn
+    return st.session_state.db_conn
+
+
+def init_conversation_db(conn: sqlite3.Connection):
+    """Tune the connection and create the conversation table in a single script."""
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA busy_timeout=5000;
+        PRAGMA temp_store=MEMORY;
+        CREATE TABLE IF NOT EXISTS conversation (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
 
 
 def load_conversation_history():
     """Load conversation history from database."""
-    with closing(sqlite3.connect(DB_PATH)) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.execute(
-            "SELECT role, content FROM conversation ORDER BY id")
-        return [{"role": row["role"], "content": row["content"]} for row in cursor.fetchall()]
+    conn = get_db_conn()
+    cursor = conn.execute(
+        "SELECT role, content FROM conversation ORDER BY id")
+    return [{"role": role, "content": content} for role, content in cursor.fetchall()]
 
 
-def add_to_history(role: str, content: str):
-    """Add a message to the conversation database."""
-    with closing(sqlite3.connect(DB_PATH)) as conn:
-        conn.execute(
-            "INSERT INTO conversation (role, content) VALUES (?, ?)", (role, content))
-        conn.commit()
+def add_to_history(messages: list):
+    """Add (role, content) messages to the conversation database in one transaction."""
+    conn = get_db_conn()
+    with conn:
+        conn.executemany(
+            "INSERT INTO conversation (role, content) VALUES (?, ?)", messages)
 
 
 def clear_conversation_history():
     """Clear the conversation database."""
-    with closing(sqlite3.connect(DB_PATH)) as conn:
-        conn.execute("DELETE FROM conversation")
-        conn.commit()
+    conn = get_db_conn()
+    conn.execute("DELETE FROM conversation")
+    conn.commit()
+
+
+@st.cache_resource
+def get_anthropic_client(api_key: str) -> anthropic.Anthropic:
+    """Create the Anthropic client once per API key and share it across reruns."""
+    return anthropic.Anthropic(api_key=api_key)
+
+
+class MCPSessionManager:
+    """Keep one connected FastMCP client per server URL and reuse it across calls."""
+
+    def __init__(self):
+        # url -> (event loop, lock, connected client or None)
+        self._sessions = {}
+
+    async def get(self, url: str) -> fastmcp.Client:
+        """Return a connected client for url, connecting on first use."""
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(url)
+        if entry is None or entry[0] is not loop:
+            # A client is bound to the event loop that connected it
+            entry = (loop, asyncio.Lock(), None)
+            self._sessions[url] = entry
+        lock = entry[1]
+        async with lock:
+            client = self._sessions[url][2]
+            if client is None or not client.is_connected():
+                client = fastmcp.Client(url, timeout=10)
+                await client.__aenter__()
+                self._sessions[url] = (loop, lock, client)
+            return client
+
+    async def aclose(self):
+        """Disconnect every cached client."""
+        sessions, self._sessions = self._sessions, {}
+        for _, _, client in sessions.values():
+            if client is None:
+                continue
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception:
+                pass
+
+
+@st.cache_resource
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Start one background event loop that outlives individual reruns."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+def run_async(coro, timeout: float = 15):
+    """Run a coroutine on the background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout=timeout)
+
+
+@st.cache_resource
+def get_session_manager() -> MCPSessionManager:
+    """Create the process-wide MCP session manager."""
+    manager = MCPSessionManager()
+    atexit.register(lambda: run_async(manager.aclose(), timeout=5))
+    return manager
 
 
 async def get_available_tools():
-    """Fetch available tools from the MCP server using FastMCP Client."""
-    try:
-        async with fastmcp.Client(SERVER_URL, timeout=10) as client:
-            tools = await client.list_tools()
-            if isinstance(tools, list):
-                tool_names = [tool.name.replace("_", ".") for tool in tools]
-            elif isinstance(tools, dict):
-                tool_names = [name.replace("_", ".") for name in tools.keys()]
-            else:
-                tool_names = []
-            return tool_names
-    except Exception as e:
-        st.session_state.tool_error = f"Failed to connect to {SERVER_URL}: {str(e)}"
-        return []
+    """Fetch available tools from the MCP server using a shared FastMCP Client."""
+    client = await get_session_manager().get(SERVER_URL)
+    tools = await client.list_tools()
+    if isinstance(tools, list):
+        tool_names = [tool.name.replace("_", ".") for tool in tools]
+    elif isinstance(tools, dict):
+        tool_names = [name.replace("_", ".") for name in tools.keys()]
+    else:
+        tool_names = []
+    return tool_names
+
+
+@st.cache_resource
+def get_tools_cached() -> tuple:
+    """Fetch tool names once and share them across reruns; failures are not cached."""
+    return tuple(run_async(get_available_tools()))
 
 
 def sync_get_available_tools():
     """Synchronous wrapper for get_available_tools."""
     try:
-        return anyio.run(get_available_tools)
+        return list(get_tools_cached())
     except Exception as e:
-        st.session_state.tool_error = f"Error fetching tools: {str(e)}"
+        st.session_state.tool_error = f"Failed to connect to {SERVER_URL}: {str(e)}"
         return []
 
 
-# Initialize database
-init_conversation_db()
+def render_stream(stream, container) -> str:
+    """Render streamed text into container, redrawing every RENDER_BATCH chunks or RENDER_INTERVAL seconds."""
+    accumulated = ""
+    buf = []
+    last_flush = time.monotonic()
+    for event in stream:
+        if event.type == "content_block_start" and hasattr(event.content_block, "text"):
+            buf.append(event.content_block.text)
+        elif event.type == "content_block_delta" and hasattr(event.delta, "text"):
+            buf.append(event.delta.text)
+        elif event.type != "content_block_stop":
+            continue
+        now = time.monotonic()
+        if buf and (event.type == "content_block_stop" or len(buf) >= RENDER_BATCH
+                    or now - last_flush > RENDER_INTERVAL):
+            accumulated += "".join(buf)
+            buf.clear()
+            last_flush = now
+            container.markdown(f"**AI Agent**: {accumulated}")
+    if buf:
+        accumulated += "".join(buf)
+        container.markdown(f"**AI Agent**: {accumulated}")
+    return accumulated
+
 
 # Initialize Streamlit app
 st.set_page_config(page_title="MCP Client with AI Agents", layout="wide")
@@ -122,7 +253,7 @@ if not api_key:
 
 # Initialize Anthropic client
 if "client" not in st.session_state:
-    st.session_state.client = anthropic.Anthropic(api_key=api_key)
+    st.session_state.client = get_anthropic_client(api_key)
 
 # Fetch and cache available tools
 if "tools" not in st.session_state:
@@ -149,8 +280,8 @@ if page == "Configuration":
         if api_key_input:
             if save_api_key(api_key_input):
                 st.success("API key saved successfully!")
-                st.session_state.client = anthropic.Anthropic(
-                    api_key=api_key_input)
+                st.session_state.client = get_anthropic_client(api_key_input)
+                get_tools_cached.clear()
                 st.session_state.tools = sync_get_available_tools()
             else:
                 st.error("Failed to save API key.")
@@ -163,10 +294,15 @@ else:
 
     if st.button("Clear Conversation History"):
         clear_conversation_history()
+        st.session_state.history = []
         st.success("Conversation history cleared!")
         st.rerun()
 
-    conversation_history = load_conversation_history()
+    # Load history from the database once per session; later turns are
+    # appended in memory and only the new rows are persisted
+    if "history" not in st.session_state:
+        st.session_state.history = load_conversation_history()
+    conversation_history = st.session_state.history
 
     st.subheader("Conversation History")
     for message in conversation_history:
@@ -182,20 +318,17 @@ else:
 
     if user_input:
         conversation_history.append({"role": "user", "content": user_input})
-        add_to_history("user", user_input)
+        # Rows for this turn are written together once the response is done
+        pending = [("user", user_input)]
 
         with st.chat_message("user"):
             st.markdown(f"**You**: {user_input}")
 
-        tool_keywords = ["select ", " from ", "file", "directory", "search files", "iam", "user",
-                         "group", "role", "policy", "access key", "cost", "email", "send", "read", "trash", "unread"]
-        requires_tool = any(keyword in user_input.lower()
-                            for keyword in tool_keywords)
+        requires_tool = TOOL_KEYWORDS_RE.search(user_input) is not None
 
         try:
             with st.chat_message("assistant"):
                 response_container = st.empty()
-                full_response = []
                 if requires_tool:
                     with st.session_state.client.beta.messages.stream(
                         model="claude-sonnet-4-20250514",
@@ -209,45 +342,33 @@ else:
                             "anthropic-beta": "mcp-client-2025-04-04"
                         }
                     ) as stream:
-                        for event in stream:
-                            if event.type == "content_block_start" and hasattr(event.content_block, "text"):
-                                full_response.append(event.content_block.text)
-                                response_container.markdown(
-                                    f"**AI Agent**: {''.join(full_response)}")
-                            elif event.type == "content_block_delta" and hasattr(event.delta, "text"):
-                                full_response.append(event.delta.text)
-                                response_container.markdown(
-                                    f"**AI Agent**: {''.join(full_response)}")
-                            elif event.type == "content_block_stop":
-                                continue
+                        full_response = render_stream(
+                            stream, response_container)
                 else:
                     with st.session_state.client.beta.messages.stream(
                         model="claude-sonnet-4-20250514",
                         max_tokens=1000,
                         messages=conversation_history
                     ) as stream:
-                        for event in stream:
-                            if event.type == "content_block_start" and hasattr(event.content_block, "text"):
-                                full_response.append(event.content_block.text)
-                                response_container.markdown(
-                                    f"**AI Agent**: {''.join(full_response)}")
-                            elif event.type == "content_block_delta" and hasattr(event.delta, "text"):
-                                full_response.append(event.delta.text)
-                                response_container.markdown(
-                                    f"**AI Agent**: {''.join(full_response)}")
-                            elif event.type == "content_block_stop":
-                                continue
+                        full_response = render_stream(
+                            stream, response_container)
 
                 if full_response:
-                    add_to_history("assistant", "".join(full_response))
+                    assistant_text = full_response
                 else:
                     response_container.markdown(
                         "[red]No valid response received[/red]")
-                    add_to_history("assistant", "No valid response received")
+                    assistant_text = "No valid response received"
+                pending.append(("assistant", assistant_text))
+                conversation_history.append(
+                    {"role": "assistant", "content": assistant_text})
 
         except Exception as e:
             with st.chat_message("assistant"):
                 st.markdown(f"[red]Client error: {str(e)}[/red]")
-            add_to_history("assistant", f"Error: {str(e)}")
+            pending.append(("assistant", f"Error: {str(e)}"))
+            conversation_history.append(
+                {"role": "assistant", "content": f"Error: {str(e)}"})
 
+        add_to_history(pending)
         st.rerun()
@@ -1,4 +1,4 @@
-import json
+import orjson
 import os
 import logging
 import streamlit as st
@@ -7,10 +7,14 @@ import streamlit as st
 MCP_CLIENT_CONFIG_PATH = "config/mcp_client_config.json"
 
 
+@st.cache_data(ttl=300)
 def load_mcp_config() -> dict:
     """
     Load the entire MCP configuration from mcp_client_config.json.
 
+    The parsed result is cached for a few minutes so Streamlit reruns do not
+    re-read the file; call load_mcp_config.clear() after writing to it.
+
     Returns:
         dict: The full configuration as a dictionary.
 
@@ -22,8 +26,8 @@ def load_mcp_config() -> dict:
         if not os.path.exists(MCP_CLIENT_CONFIG_PATH):
             raise FileNotFoundError(
                 f"Config file not found: {MCP_CLIENT_CONFIG_PATH}")
-        with open(MCP_CLIENT_CONFIG_PATH, "r") as f:
-            config = json.load(f)
+        with open(MCP_CLIENT_CONFIG_PATH, "rb") as f:
+            config = orjson.loads(f.read())
         if not isinstance(config, dict):
             raise ValueError(
                 f"Invalid JSON format in {MCP_CLIENT_CONFIG_PATH}")
@@ -0,0 +1,82 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Union
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+# Minimum level recorded; set MCP_LOG_LEVEL=DEBUG to trace individual calls
+LOG_LEVEL = os.environ.get("MCP_LOG_LEVEL", "INFO").upper()
+
+# One queue per log file, shared by every logger that writes to it. Loggers
+# only enqueue records; a listener thread per file does the file writes.
+_QUEUE_HANDLERS: Dict[str, QueueHandler] = {}
+_LISTENERS: Dict[str, QueueListener] = {}
+
+
+def _queue_handler(filename: str) -> QueueHandler:
+    """Return the queue handler for a log file, starting its listener on first use."""
+    handler = _QUEUE_HANDLERS.get(filename)
+    if handler is None:
+        log_queue = queue.SimpleQueue()
+        file_handler = RotatingFileHandler(
+            filename, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+        handler = QueueHandler(log_queue)
+        _QUEUE_HANDLERS[filename] = handler
+        _LISTENERS[filename] = listener
+    return handler
+
+
+def _stop_listeners() -> None:
+    """Flush queued records to their files at exit."""
+    for listener in _LISTENERS.values():
+        listener.stop()
+
+
+atexit.register(_stop_listeners)
+
+
+def get_file_logger(name: str, filename: str, level: Optional[Union[int, str]] = None) -> logging.Logger:
+    """
+    Return a logger that writes to its own rotating log file.
+
+    The handler is attached only the first time the logger is requested, so
+    re-importing a module does not open the log file again. Loggers writing
+    to the same file share one queue and file handler so rotation happens
+    once, and records are written by a background thread.
+
+    Args:
+        name (str): Logger name.
+        filename (str): Path of the log file.
+        level (Optional[Union[int, str]]): Minimum level to record, LOG_LEVEL if omitted.
+
+    Returns:
+        logging.Logger: The configured logger.
+    """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(_queue_handler(filename))
+        logger.setLevel(level if level is not None else LOG_LEVEL)
+        logger.propagate = False
+    return logger
+
+
+def configure_root_logging(filename: str, level: Optional[Union[int, str]] = None) -> None:
+    """
+    Send records from the root logger, and loggers that propagate to it, to a log file.
+
+    Args:
+        filename (str): Path of the log file.
+        level (Optional[Union[int, str]]): Minimum level to record, LOG_LEVEL if omitted.
+    """
+    root = logging.getLogger()
+    handler = _queue_handler(filename)
+    if handler not in root.handlers:
+        root.addHandler(handler)
+    root.setLevel(level if level is not None else LOG_LEVEL)
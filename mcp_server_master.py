@@ -1,19 +1,12 @@
 import fastmcp
+import importlib
 import logging
 import anyio
-from servers.sqlite.mcp_server_sqlite import mcp as sqlite_mcp
-from servers.filesystem.filesystem_mcp import mcp as filesystem_mcp
-from servers.aws.aws_iam_mcp import mcp as aws_mcp
-from servers.gmail.gmail_mcp import mcp as gmail_mcp
 from config.config_loader import load_mcp_config
+from config.logging_config import configure_root_logging
 
 # Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filename="./mcp-server-master.log",
-    filemode="a"
-)
+configure_root_logging("./mcp-server-master.log")
 logger = logging.getLogger("mcp_server_master")
 
 # Load configuration
@@ -29,40 +22,31 @@ try:
     SERVER_NAME = server_config["serverName"]
     PORT = server_config["port"]
 except Exception as e:
-    logger.error(f"Failed to load configuration: {str(e)}")
+    logger.error("Failed to load configuration: %s", e)
     raise
 
 # Initialize master MCP server
 master_mcp = fastmcp.FastMCP(SERVER_NAME)
 
-# Import and mount subservers
-try:
-    master_mcp.mount(sqlite_mcp, prefix="sqlite-server")
-    logger.info("Mounted sqlite-server")
-except Exception as e:
-    logger.error(f"Failed to mount sqlite-server: {str(e)}")
-    raise
-
-try:
-    master_mcp.mount(filesystem_mcp, prefix="filesystem-server")
-    logger.info("Mounted filesystem-server")
-except Exception as e:
-    logger.error(f"Failed to mount filesystem-server: {str(e)}")
-    raise
-
-try:
-    master_mcp.mount(aws_mcp, prefix="aws-server")
-    logger.info("Mounted aws-server")
-except Exception as e:
-    logger.error(f"Failed to mount aws-server: {str(e)}")
-    raise
+# Subservers to mount as (module path, prefix); each module exposes `mcp`.
+# Imports are deferred to the loop so a failing subserver is logged like any
+# other mount error
+SUBSERVERS = [
+    ("servers.sqlite.mcp_server_sqlite", "sqlite-server"),
+    ("servers.filesystem.filesystem_mcp", "filesystem-server"),
+    ("servers.aws.aws_iam_mcp", "aws-server"),
+    ("servers.gmail.gmail_mcp", "gmail-server"),
+]
 
-try:
-    master_mcp.mount(gmail_mcp, prefix="gmail-server")
-    logger.info("Mounted gmail-server")
-except Exception as e:
-    logger.error(f"Failed to mount gmail-server: {str(e)}")
-    raise
+# Import and mount subservers
+for module_path, prefix in SUBSERVERS:
+    try:
+        subserver = importlib.import_module(module_path).mcp
+        master_mcp.mount(subserver, prefix=prefix)
+        logger.info("Mounted %s", prefix)
+    except Exception as e:
+        logger.error("Failed to mount %s: %s", prefix, e)
+        raise
 
 
 async def log_tools():
@@ -70,12 +54,12 @@ async def log_tools():
     try:
         tools = await master_mcp.get_tools()
         tool_names = list(tools.keys())
-        logger.info(f"Registered tools: {tool_names}")
+        logger.info("Registered tools: %s", tool_names)
     except Exception as e:
-        logger.error(f"Failed to log tools: {str(e)}")
+        logger.error("Failed to log tools: %s", e)
 
 if __name__ == "__main__":
     # Log registered tools
     anyio.run(log_tools)
-    logger.info(f"Starting {SERVER_NAME} on http://localhost:{PORT}")
+    logger.info("Starting %s on http://localhost:%s", SERVER_NAME, PORT)
     master_mcp.run(transport="http", port=PORT, host="0.0.0.0")
@@ -24,8 +24,10 @@ SALARY_STRUCTURES = [
 def create_salary_table():
     """Create salary_structure table, populate it, and create a view."""
     try:
-        with closing(sqlite3.connect(DB_PATH)) as conn:
+        with closing(sqlite3.connect(DB_PATH, isolation_level=None)) as conn:
             cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("BEGIN")
 
             # Create salary_structure table
             cursor.execute("""
@@ -37,10 +39,12 @@ def create_salary_table():
             """)
 
             # Populate salary_structure for ids 1 to 100
+            rows = list(zip(range(1, 101),
+                            random.choices(SALARY_STRUCTURES, k=100)))
             cursor.executemany("""
                 INSERT OR REPLACE INTO salary_structure (id, salary_structure)
                 VALUES (?, ?)
-            """, [(i, random.choice(SALARY_STRUCTURES)) for i in range(1, 101)])
+            """, rows)
 
             # Create view joining candidates and salary_structure
             cursor.execute("""
@@ -61,7 +65,7 @@ def create_salary_table():
                 LEFT JOIN salary_structure s ON c.id = s.id
             """)
 
-            conn.commit()
+            cursor.execute("COMMIT")
             print(
                 f"Successfully created salary_structure table and candidate_salary_view in {DB_PATH}.")
     except Exception as e:
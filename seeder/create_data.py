@@ -19,29 +19,26 @@ SKILLS = ["Python", "Java", "JavaScript", "C++", "Ruby", "SQL", "Go", "TypeScrip
           "Docker", "Kubernetes", "Git", "Jenkins", "Terraform", "Ansible", "VS Code", "IntelliJ"]
 
 
-def get_random_user(max_retries=3):
-    """Fetch a random user from the API with retries."""
+def get_random_users(session, count, max_retries=3):
+    """Fetch `count` random users from the API in a single bulk request, with retries."""
     for attempt in range(max_retries):
         try:
-            response = requests.get("https://randomuser.me/api/", timeout=5)
+            response = session.get("https://randomuser.me/api/",
+                                   params={"results": count}, timeout=10)
             response.raise_for_status()
             data = response.json()
             if "results" in data and len(data["results"]) > 0:
-                return data["results"][0]
+                return data["results"]
             else:
                 print(f"Empty results in attempt {attempt + 1}")
         except (requests.RequestException, ValueError) as e:
-            print(f"Error fetching user in attempt {attempt + 1}: {e}")
+            print(f"Error fetching users in attempt {attempt + 1}: {e}")
         time.sleep(1)  # Wait before retrying
-    return None
+    return []
 
 
-def generate_candidate(id):
+def generate_candidate(id, user):
     """Generate a candidate dictionary from API data."""
-    user = get_random_user()
-    if not user:
-        return None
-
     # Randomly select 1-3 assets and 1-4 skills
     physical_assets = random.sample(PHYSICAL_ASSETS, random.randint(1, 3))
     digital_assets = random.sample(DIGITAL_ASSETS, random.randint(1, 3))
@@ -75,28 +72,30 @@ def main():
     # Ensure output directory exists
     os.makedirs(CSV_PATH.parent, exist_ok=True)
 
-    # Generate 100 candidates
-    candidates = []
-    i = 1
-    while len(candidates) < 100 and i <= 150:  # Allow extra attempts to ensure 100 entries
-        print(f"Generating candidate {i}")
-        candidate = generate_candidate(i)
-        if candidate:
-            candidates.append(candidate)
-        else:
-            print(f"Failed to generate candidate {i}")
-        i += 1
-
-    # Write to CSV with UTF-8 encoding
+    # Generate 100 candidates, writing each row as soon as it is built so
+    # memory stays flat and partial progress survives a failed fetch. The API
+    # returns up to 5000 users per request, so this is usually a single
+    # round-trip over one keep-alive session
+    written = 0
+    attempts = 0
     try:
-        with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
+        with open(CSV_PATH, "w", newline="", encoding="utf-8", buffering=1 << 20) as f, \
+                requests.Session() as session:
             writer = csv.DictWriter(
                 f, fieldnames=["id", "name", "contact", "cell", "state", "physical_assets",
                                "digital_assets", "serving_notice", "last_working_day", "skills"])
             writer.writeheader()
-            writer.writerows(candidates)
+            while written < 100 and attempts < 3:
+                attempts += 1
+                users = get_random_users(session, 100 - written)
+                if not users:
+                    print(f"Failed to fetch users in batch {attempts}")
+                for user in users[:100 - written]:
+                    written += 1
+                    writer.writerow(generate_candidate(written, user))
+                print(f"Generated {written} candidates")
         print(
-            f"Successfully created {CSV_PATH} with {len(candidates)} entries.")
+            f"Successfully created {CSV_PATH} with {written} entries.")
     except Exception as e:
         print(f"Error writing CSV: {e}")
 
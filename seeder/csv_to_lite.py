@@ -14,10 +14,15 @@ def create_database():
     # Ensure output directory exists
     os.makedirs(DB_PATH.parent, exist_ok=True)
 
-    # Connect to SQLite database
+    # Connect to SQLite database in autocommit mode so the bulk insert runs
+    # inside the single explicit transaction below
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
         cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
 
         # Create candidates table
         cursor.execute("""
@@ -35,34 +40,40 @@ def create_database():
             )
         """)
 
-        # Read CSV and insert into table
+        # Read CSV and bulk insert into table in one transaction
         with open(CSV_PATH, newline="", encoding="utf-8") as f:
             reader = csv.DictReader(f)
-            for row in reader:
-                cursor.execute("""
+            rows = ((
+                int(row["id"]),
+                row["name"],
+                row["contact"],
+                row["cell"],
+                row["state"],
+                row["physical_assets"],
+                row["digital_assets"],
+                row["serving_notice"],
+                row["last_working_day"],
+                row["skills"]
+            ) for row in reader)
+            cursor.execute("BEGIN")
+            try:
+                cursor.executemany("""
                     INSERT INTO candidates (id, name, contact, cell, state, physical_assets, digital_assets, serving_notice, last_working_day, skills)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    int(row["id"]),
-                    row["name"],
-                    row["contact"],
-                    row["cell"],
-                    row["state"],
-                    row["physical_assets"],
-                    row["digital_assets"],
-                    row["serving_notice"],
-                    row["last_working_day"],
-                    row["skills"]
-                ))
+                """, rows)
+                inserted = cursor.rowcount
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
 
-        # Commit and close
-        conn.commit()
         print(
-            f"Successfully created {DB_PATH} with {reader.line_num - 1} records.")
+            f"Successfully created {DB_PATH} with {inserted} records.")
     except Exception as e:
         print(f"Error creating database: {e}")
     finally:
-        conn.close()
+        if conn is not None:
+            conn.close()
 
 
 if __name__ == "__main__":
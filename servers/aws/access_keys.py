@@ -1,8 +1,9 @@
 from fastmcp import FastMCP
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
-from .utils import get_aws_session, handle_aws_error
-import json
+from .utils import get_iam_client, handle_aws_error, to_json
+from .cache import cached, invalidates
+import asyncio
 
 mcp = FastMCP("IAMAccessKeys")
 
@@ -20,43 +21,49 @@ class DeleteAccessKeyArgs(BaseModel):
     access_key_id: str = Field(description="Access key ID to delete")
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("access_keys")
 async def create_access_key(args: Dict[str, Any]) -> str:
     """Create an IAM access key for a user."""
     try:
-        parsed = CreateAccessKeyArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.create_access_key(UserName=parsed.username)
-        return json.dumps({
+        parsed = CreateAccessKeyArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.create_access_key, UserName=parsed.username)
+        return to_json({
             "access_key_id": response["AccessKey"]["AccessKeyId"],
             "secret_access_key": response["AccessKey"]["SecretAccessKey"]
         })
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@cached("access_keys")
 async def list_access_keys(args: Dict[str, Any]) -> str:
     """List IAM access keys for a user."""
     try:
-        parsed = ListAccessKeysArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.list_access_keys(UserName=parsed.username)
+        parsed = ListAccessKeysArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.list_access_keys, UserName=parsed.username)
         keys = [{"AccessKeyId": key["AccessKeyId"], "Status": key["Status"]}
                 for key in response["AccessKeyMetadata"]]
-        return json.dumps({"access_keys": keys})
+        return to_json({"access_keys": keys})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("access_keys")
 async def delete_access_key(args: Dict[str, Any]) -> str:
     """Delete an IAM access key for a user."""
     try:
-        parsed = DeleteAccessKeyArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.delete_access_key(
+        parsed = DeleteAccessKeyArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.delete_access_key,
             UserName=parsed.username, AccessKeyId=parsed.access_key_id)
-        return json.dumps({"message": f"Access key {parsed.access_key_id} deleted for user {parsed.username}"})
+        return to_json({"message": f"Access key {parsed.access_key_id} deleted for user {parsed.username}"})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
@@ -1,23 +1,12 @@
 from fastmcp import FastMCP
-import logging
+import importlib
 import json
 import os
-from .users import mcp as users_mcp
-from .groups import mcp as groups_mcp
-from .roles import mcp as roles_mcp
-from .policies import mcp as policies_mcp
-from .access_keys import mcp as access_keys_mcp
-from .cost_explorer import mcp as cost_explorer_mcp
 from config.config_loader import load_mcp_config
+from config.logging_config import get_file_logger
 
 # Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filename="./aws-iam-mcp.log",
-    filemode="a"
-)
-logger = logging.getLogger("mcp_server_aws")
+logger = get_file_logger("mcp_server_aws", "./aws-iam-mcp.log")
 
 # Load configuration
 try:
@@ -30,55 +19,33 @@ try:
         raise ValueError(f"Missing serverName in aws-server configuration")
     SERVER_NAME = server_config["serverName"]
 except Exception as e:
-    logger.error(f"Failed to load configuration: {str(e)}")
+    logger.error("Failed to load configuration: %s", e)
     raise
 
 # Initialize MCP server
 mcp = FastMCP(SERVER_NAME)
 
-# Mount subservers
-try:
-    mcp.mount(users_mcp, prefix="users")
-    logger.info("Mounted users subserver")
-except Exception as e:
-    logger.error(f"Failed to mount users subserver: {str(e)}")
-    raise
-
-try:
-    mcp.mount(groups_mcp, prefix="groups")
-    logger.info("Mounted groups subserver")
-except Exception as e:
-    logger.error(f"Failed to mount groups subserver: {str(e)}")
-    raise
-
-try:
-    mcp.mount(roles_mcp, prefix="roles")
-    logger.info("Mounted roles subserver")
-except Exception as e:
-    logger.error(f"Failed to mount roles subserver: {str(e)}")
-    raise
-
-try:
-    mcp.mount(policies_mcp, prefix="policies")
-    logger.info("Mounted policies subserver")
-except Exception as e:
-    logger.error(f"Failed to mount policies subserver: {str(e)}")
-    raise
-
-try:
-    mcp.mount(access_keys_mcp, prefix="access-keys")
-    logger.info("Mounted access-keys subserver")
-except Exception as e:
-    logger.error(f"Failed to mount access-keys subserver: {str(e)}")
-    raise
-
-try:
-    mcp.mount(cost_explorer_mcp, prefix="cost-explorer")
-    logger.info("Mounted cost-explorer subserver")
-except Exception as e:
-    logger.error(f"Failed to mount cost-explorer subserver: {str(e)}")
-    raise
+# Subservers to mount as (module, prefix); each module exposes `mcp`
+SUBSERVERS = [
+    (".users", "users"),
+    (".groups", "groups"),
+    (".roles", "roles"),
+    (".policies", "policies"),
+    (".access_keys", "access-keys"),
+    (".cost_explorer", "cost-explorer"),
+    (".batch", "batch"),
+]
+
+# Import and mount subservers
+for module_name, prefix in SUBSERVERS:
+    try:
+        subserver = importlib.import_module(module_name, __package__).mcp
+        mcp.mount(subserver, prefix=prefix)
+        logger.info("Mounted %s subserver", prefix)
+    except Exception as e:
+        logger.error("Failed to mount %s subserver: %s", prefix, e)
+        raise
 
 if __name__ == "__main__":
-    logger.info(f"Starting {SERVER_NAME}")
+    logger.info("Starting %s", SERVER_NAME)
     # Note: Not running standalone; will be mounted by master server
@@ -0,0 +1,62 @@
+from fastmcp import FastMCP
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List
+from .utils import handle_aws_error, to_json
+from . import access_keys, groups, policies, roles, users
+import asyncio
+import orjson
+
+mcp = FastMCP("IAMBatch")
+
+# Default number of operations dispatched at once
+MAX_CONCURRENCY = 8
+
+# IAM tools that can be batched, by tool name. Depending on the FastMCP
+# version, the decorator returns the function itself or a Tool object that
+# keeps it on `.fn`.
+_TOOLS = [
+    users.create_iam_user, users.list_iam_users, users.update_iam_user, users.delete_iam_user,
+    groups.create_iam_group, groups.list_iam_groups,
+    groups.add_user_to_group, groups.remove_user_from_group,
+    roles.create_iam_role, roles.list_iam_roles, roles.delete_iam_role,
+    policies.create_iam_policy, policies.list_iam_policies, policies.delete_iam_policy,
+    access_keys.create_access_key, access_keys.list_access_keys, access_keys.delete_access_key,
+]
+TOOL_REGISTRY = {fn.__name__: fn for fn in (
+    getattr(tool, "fn", tool) for tool in _TOOLS)}
+
+
+class BatchOperation(BaseModel):
+    tool: str = Field(description="Name of the IAM tool to call, e.g. add_user_to_group")
+    args: Dict[str, Any] = Field(
+        default_factory=dict, description="Arguments for the tool")
+
+
+class BatchExecuteArgs(BaseModel):
+    ops: List[BatchOperation] = Field(description="Operations to run")
+    max_concurrency: int = Field(
+        default=MAX_CONCURRENCY, ge=1, description="Maximum operations running at once")
+
+
+@mcp.tool(output_schema=None)
+async def batch_execute(args: Dict[str, Any]) -> str:
+    """Run several IAM tool calls in one request, concurrently, and return their results in order."""
+    try:
+        parsed = BatchExecuteArgs.model_validate(args)
+        semaphore = asyncio.Semaphore(parsed.max_concurrency)
+
+        async def run(op: BatchOperation) -> Dict[str, Any]:
+            fn = TOOL_REGISTRY.get(op.tool)
+            if fn is None:
+                return {"tool": op.tool, "result": {"error": f"Unknown tool: {op.tool}"}}
+            async with semaphore:
+                try:
+                    result = orjson.loads(await fn(op.args))
+                except Exception as e:
+                    result = handle_aws_error(e)
+            return {"tool": op.tool, "result": result}
+
+        results = await asyncio.gather(*(run(op) for op in parsed.ops))
+        return to_json({"results": results})
+    except Exception as e:
+        return to_json(handle_aws_error(e))
@@ -0,0 +1,85 @@
+import functools
+import hashlib
+import orjson
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Seconds a cached list response stays valid
+DEFAULT_TTL = 10
+# Upper bound on cached responses before expired entries are swept
+MAX_ENTRIES = 256
+
+# Serialized {"error": ...} responses start with this and are never cached
+_ERROR_PREFIX = '{"error":'
+
+
+class TTLCache:
+    """In-memory response cache with per-entry expiry, grouped by namespace."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, bytes], Tuple[float, str]] = {}
+
+    def get(self, namespace: str, key: bytes) -> Optional[str]:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[(namespace, key)]
+            return None
+        return value
+
+    def set(self, namespace: str, key: bytes, value: str, ttl: float) -> None:
+        if len(self._entries) >= self.max_entries:
+            now = time.monotonic()
+            self._entries = {k: v for k, v in self._entries.items()
+                             if v[0] >= now}
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+        self._entries[(namespace, key)] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, *namespaces: str) -> None:
+        self._entries = {k: v for k, v in self._entries.items()
+                         if k[0] not in namespaces}
+
+
+response_cache = TTLCache()
+
+
+def cache_key(tool_name: str, args: Dict[str, Any]) -> bytes:
+    """Hash a tool name and its arguments into a cache key."""
+    payload = orjson.dumps(args, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(tool_name.encode() + payload, digest_size=16).digest()
+
+
+def cached(namespace: str, ttl: float = DEFAULT_TTL) -> Callable:
+    """Cache a read-only tool's JSON response for ttl seconds per argument set."""
+    def decorator(func: Callable[[Dict[str, Any]], Awaitable[str]]) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(args: Dict[str, Any]) -> str:
+            try:
+                key = cache_key(func.__name__, args)
+            except TypeError:
+                return await func(args)
+            result = response_cache.get(namespace, key)
+            if result is None:
+                result = await func(args)
+                if not result.startswith(_ERROR_PREFIX):
+                    response_cache.set(namespace, key, result, ttl)
+            return result
+        return wrapper
+    return decorator
+
+
+def invalidates(*namespaces: str) -> Callable:
+    """Drop cached responses in the given namespaces after a mutating tool runs."""
+    def decorator(func: Callable[[Dict[str, Any]], Awaitable[str]]) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(args: Dict[str, Any]) -> str:
+            try:
+                return await func(args)
+            finally:
+                response_cache.invalidate(*namespaces)
+        return wrapper
+    return decorator
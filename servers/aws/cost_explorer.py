@@ -1,9 +1,9 @@
 from fastmcp import FastMCP
 from pydantic import BaseModel, Field
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 from datetime import datetime
-from .utils import get_aws_session, handle_aws_error
-import json
+from .utils import get_aws_client, handle_aws_error, to_json
+import asyncio
 
 mcp = FastMCP("CostExplorer")
 
@@ -17,38 +17,49 @@ class GetCostDataArgs(BaseModel):
         default="SERVICE", description="Group by: SERVICE, REGION, or USAGE_TYPE")
 
 
-@mcp.tool()
-async def get_cost_data(args: Dict[str, Any]) -> str:
-    """Get AWS Cost Management cost and usage data."""
-    try:
-        parsed = GetCostDataArgs(**args)
-        ce_client = get_aws_session().client("ce")
-        start = datetime.strptime(parsed.start_date, "%Y-%m-%d")
-        end = datetime.strptime(parsed.end_date, "%Y-%m-%d")
-        if start >= end:
-            return json.dumps({"error": "start_date must be before end_date"})
-        if end > datetime.now():
-            return json.dumps({"error": "end_date cannot be in the future"})
-
-        response = ce_client.get_cost_and_usage(
-            TimePeriod={
-                "Start": parsed.start_date,
-                "End": parsed.end_date
-            },
-            Granularity=parsed.granularity,
-            Metrics=["UnblendedCost"],
-            GroupBy=[{"Type": "DIMENSION", "Key": parsed.group_by}]
-        )
-        results = []
+def iter_cost_records(ce_client: Any, parsed: GetCostDataArgs) -> Iterator[Dict[str, Any]]:
+    """Yield one cost record per group, fetching result pages one at a time."""
+    request = {
+        "TimePeriod": {
+            "Start": parsed.start_date,
+            "End": parsed.end_date
+        },
+        "Granularity": parsed.granularity,
+        "Metrics": ["UnblendedCost"],
+        "GroupBy": [{"Type": "DIMENSION", "Key": parsed.group_by}]
+    }
+    while True:
+        response = ce_client.get_cost_and_usage(**request)
         for result in response["ResultsByTime"]:
             time_period = result["TimePeriod"]
             for group in result["Groups"]:
-                results.append({
+                yield {
                     "TimePeriod": time_period,
                     parsed.group_by: group["Keys"][0],
                     "Cost": group["Metrics"]["UnblendedCost"]["Amount"],
                     "Currency": group["Metrics"]["UnblendedCost"]["Unit"]
-                })
-        return json.dumps({"costs": results})
+                }
+        next_token = response.get("NextPageToken")
+        if not next_token:
+            break
+        request["NextPageToken"] = next_token
+
+
+@mcp.tool(output_schema=None)
+async def get_cost_data(args: Dict[str, Any]) -> str:
+    """Get AWS Cost Management cost and usage data."""
+    try:
+        parsed = GetCostDataArgs.model_validate(args)
+        ce_client = get_aws_client("ce")
+        start = datetime.strptime(parsed.start_date, "%Y-%m-%d")
+        end = datetime.strptime(parsed.end_date, "%Y-%m-%d")
+        if start >= end:
+            return to_json({"error": "start_date must be before end_date"})
+        if end > datetime.now():
+            return to_json({"error": "end_date cannot be in the future"})
+
+        results = await asyncio.to_thread(
+            lambda: list(iter_cost_records(ce_client, parsed)))
+        return to_json({"costs": results})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
@@ -1,8 +1,9 @@
 from fastmcp import FastMCP
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
-from .utils import get_aws_session, handle_aws_error
-import json
+from .utils import get_iam_client, handle_aws_error, to_json
+from .cache import cached, invalidates
+import asyncio
 
 mcp = FastMCP("IAMGroups")
 
@@ -26,52 +27,60 @@ class RemoveUserFromGroupArgs(BaseModel):
     username: str = Field(description="IAM username to remove from group")
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("groups")
 async def create_iam_group(args: Dict[str, Any]) -> str:
     """Create an IAM group."""
     try:
-        parsed = CreateGroupArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.create_group(GroupName=parsed.group_name)
-        return json.dumps({"group_name": response["Group"]["GroupName"], "arn": response["Group"]["Arn"]})
+        parsed = CreateGroupArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.create_group, GroupName=parsed.group_name)
+        return to_json({"group_name": response["Group"]["GroupName"], "arn": response["Group"]["Arn"]})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@cached("groups")
 async def list_iam_groups(args: Dict[str, Any]) -> str:
     """List IAM groups in the AWS account."""
     try:
-        parsed = ListGroupsArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.list_groups(MaxItems=parsed.max_items)
+        parsed = ListGroupsArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.list_groups, MaxItems=parsed.max_items)
         groups = [group["GroupName"] for group in response["Groups"]]
-        return json.dumps({"groups": groups})
+        return to_json({"groups": groups})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("groups")
 async def add_user_to_group(args: Dict[str, Any]) -> str:
     """Add an IAM user to a group."""
     try:
-        parsed = AddUserToGroupArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.add_user_to_group(
+        parsed = AddUserToGroupArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.add_user_to_group,
             GroupName=parsed.group_name, UserName=parsed.username)
-        return json.dumps({"message": f"User {parsed.username} added to group {parsed.group_name}"})
+        return to_json({"message": f"User {parsed.username} added to group {parsed.group_name}"})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("groups")
 async def remove_user_from_group(args: Dict[str, Any]) -> str:
     """Remove an IAM user from a group."""
     try:
-        parsed = RemoveUserFromGroupArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.remove_user_from_group(
+        parsed = RemoveUserFromGroupArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.remove_user_from_group,
             GroupName=parsed.group_name, UserName=parsed.username)
-        return json.dumps({"message": f"User {parsed.username} removed from group {parsed.group_name}"})
+        return to_json({"message": f"User {parsed.username} removed from group {parsed.group_name}"})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
@@ -2,7 +2,9 @@ from fastmcp import FastMCP
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
 import json
-from .utils import get_aws_session, handle_aws_error
+import asyncio
+from .utils import get_iam_client, handle_aws_error, to_json
+from .cache import cached, invalidates
 
 mcp = FastMCP("IAMPolicies")
 
@@ -22,43 +24,49 @@ class DeletePolicyArgs(BaseModel):
     policy_arn: str = Field(description="IAM policy ARN to delete")
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("policies")
 async def create_iam_policy(args: Dict[str, Any]) -> str:
     """Create an IAM policy."""
     try:
-        parsed = CreatePolicyArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.create_policy(
+        parsed = CreatePolicyArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.create_policy,
             PolicyName=parsed.policy_name,
             PolicyDocument=json.dumps(parsed.policy_document)
         )
-        return json.dumps({"policy_name": response["Policy"]["PolicyName"], "arn": response["Policy"]["Arn"]})
+        return to_json({"policy_name": response["Policy"]["PolicyName"], "arn": response["Policy"]["Arn"]})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@cached("policies")
 async def list_iam_policies(args: Dict[str, Any]) -> str:
     """List IAM policies in the AWS account."""
     try:
-        parsed = ListPoliciesArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.list_policies(
+        parsed = ListPoliciesArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.list_policies,
             Scope=parsed.scope, MaxItems=parsed.max_items)
         policies = [{"PolicyName": policy["PolicyName"], "Arn": policy["Arn"]}
                     for policy in response["Policies"]]
-        return json.dumps({"policies": policies})
+        return to_json({"policies": policies})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("policies")
 async def delete_iam_policy(args: Dict[str, Any]) -> str:
     """Delete an IAM policy."""
     try:
-        parsed = DeletePolicyArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.delete_policy(PolicyArn=parsed.policy_arn)
-        return json.dumps({"message": f"Policy {parsed.policy_arn} deleted"})
+        parsed = DeletePolicyArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.delete_policy, PolicyArn=parsed.policy_arn)
+        return to_json({"message": f"Policy {parsed.policy_arn} deleted"})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
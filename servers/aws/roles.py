@@ -2,7 +2,9 @@ from fastmcp import FastMCP
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
 import json
-from .utils import get_aws_session, handle_aws_error
+import asyncio
+from .utils import get_iam_client, handle_aws_error, to_json
+from .cache import cached, invalidates
 
 mcp = FastMCP("IAMRoles")
 
@@ -21,41 +23,47 @@ class DeleteRoleArgs(BaseModel):
     role_name: str = Field(description="IAM role name to delete")
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("roles")
 async def create_iam_role(args: Dict[str, Any]) -> str:
     """Create an IAM role with a trust policy."""
     try:
-        parsed = CreateRoleArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.create_role(
+        parsed = CreateRoleArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.create_role,
             RoleName=parsed.role_name,
             AssumeRolePolicyDocument=json.dumps(parsed.trust_policy)
         )
-        return json.dumps({"role_name": response["Role"]["RoleName"], "arn": response["Role"]["Arn"]})
+        return to_json({"role_name": response["Role"]["RoleName"], "arn": response["Role"]["Arn"]})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@cached("roles")
 async def list_iam_roles(args: Dict[str, Any]) -> str:
     """List IAM roles in the AWS account."""
     try:
-        parsed = ListRolesArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.list_roles(MaxItems=parsed.max_items)
+        parsed = ListRolesArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.list_roles, MaxItems=parsed.max_items)
         roles = [role["RoleName"] for role in response["Roles"]]
-        return json.dumps({"roles": roles})
+        return to_json({"roles": roles})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("roles")
 async def delete_iam_role(args: Dict[str, Any]) -> str:
     """Delete an IAM role."""
     try:
-        parsed = DeleteRoleArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.delete_role(RoleName=parsed.role_name)
-        return json.dumps({"message": f"Role {parsed.role_name} deleted"})
+        parsed = DeleteRoleArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.delete_role, RoleName=parsed.role_name)
+        return to_json({"message": f"Role {parsed.role_name} deleted"})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
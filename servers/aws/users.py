@@ -1,8 +1,9 @@
 from fastmcp import FastMCP
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
-from .utils import get_aws_session, handle_aws_error
-import json
+from .utils import get_iam_client, handle_aws_error, to_json
+from .cache import cached, invalidates
+import asyncio
 
 mcp = FastMCP("IAMUsers")
 
@@ -26,53 +27,61 @@ class DeleteUserArgs(BaseModel):
     username: str = Field(description="IAM username to delete")
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("users")
 async def create_iam_user(args: Dict[str, Any]) -> str:
     """Create an IAM user."""
     try:
-        parsed = CreateUserArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.create_user(UserName=parsed.username)
-        return json.dumps({"username": response["User"]["UserName"], "arn": response["User"]["Arn"]})
+        parsed = CreateUserArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.create_user, UserName=parsed.username)
+        return to_json({"username": response["User"]["UserName"], "arn": response["User"]["Arn"]})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@cached("users")
 async def list_iam_users(args: Dict[str, Any]) -> str:
     """List IAM users in the AWS account."""
     try:
-        parsed = ListUsersArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.list_users(MaxItems=parsed.max_items)
+        parsed = ListUsersArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.list_users, MaxItems=parsed.max_items)
         users = [user["UserName"] for user in response["Users"]]
-        return json.dumps({"users": users})
+        return to_json({"users": users})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("users", "access_keys")
 async def update_iam_user(args: Dict[str, Any]) -> str:
     """Update an IAM user’s name."""
     try:
-        parsed = UpdateUserArgs(**args)
-        iam_client = get_aws_session().client("iam")
+        parsed = UpdateUserArgs.model_validate(args)
+        iam_client = get_iam_client()
         if parsed.new_username:
-            response = iam_client.update_user(
+            response = await asyncio.to_thread(
+                iam_client.update_user,
                 UserName=parsed.username, NewUserName=parsed.new_username)
-            return json.dumps({"message": f"User {parsed.username} updated to {parsed.new_username}"})
-        return json.dumps({"message": f"No changes applied to user {parsed.username}"})
+            return to_json({"message": f"User {parsed.username} updated to {parsed.new_username}"})
+        return to_json({"message": f"No changes applied to user {parsed.username}"})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+@invalidates("users", "access_keys")
 async def delete_iam_user(args: Dict[str, Any]) -> str:
     """Delete an IAM user."""
     try:
-        parsed = DeleteUserArgs(**args)
-        iam_client = get_aws_session().client("iam")
-        response = iam_client.delete_user(UserName=parsed.username)
-        return json.dumps({"message": f"User {parsed.username} deleted"})
+        parsed = DeleteUserArgs.model_validate(args)
+        iam_client = get_iam_client()
+        response = await asyncio.to_thread(
+            iam_client.delete_user, UserName=parsed.username)
+        return to_json({"message": f"User {parsed.username} deleted"})
     except Exception as e:
-        return json.dumps(handle_aws_error(e))
+        return to_json(handle_aws_error(e))
@@ -1,31 +1,54 @@
 import boto3
-import logging
+import orjson
+import threading
+from botocore.config import Config
+from functools import lru_cache
 from typing import Any, Dict
+from config.logging_config import get_file_logger
 
 # Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filename="./aws-iam-mcp.log",
-    filemode="a"
-)
-logger = logging.getLogger("aws_iam_mcp_utils")
+logger = get_file_logger("aws_iam_mcp_utils", "./aws-iam-mcp.log")
 
 AWS_PROFILE = "mcp_aws"
+# Shared by every client: a larger keep-alive pool for concurrent tool calls
+# and bounded retries
+AWS_CLIENT_CONFIG = Config(max_pool_connections=50,
+                           retries={"max_attempts": 3})
 
+# boto3 sessions are not thread-safe; serialize client construction
+_CLIENT_LOCK = threading.Lock()
 
+
+@lru_cache(maxsize=1)
 def get_aws_session():
-    """Initialize boto3 session with the configured AWS profile."""
+    """Initialize boto3 session with the configured AWS profile, once per process."""
     try:
         session = boto3.Session(profile_name=AWS_PROFILE)
         logger.info("AWS session initialized successfully")
         return session
     except Exception as e:
-        logger.error(f"Failed to initialize AWS session: {str(e)}")
+        logger.error("Failed to initialize AWS session: %s", e)
         raise
 
 
+@lru_cache(maxsize=None)
+def get_aws_client(service_name: str) -> Any:
+    """Return a boto3 client for service_name, built once and reused across tool calls."""
+    with _CLIENT_LOCK:
+        return get_aws_session().client(service_name, config=AWS_CLIENT_CONFIG)
+
+
+def get_iam_client() -> Any:
+    """Return the shared IAM client."""
+    return get_aws_client("iam")
+
+
+def to_json(obj: Any) -> str:
+    """Serialize a tool response with orjson; FastMCP tools return str."""
+    return orjson.dumps(obj).decode()
+
+
 def handle_aws_error(e: Exception) -> Dict[str, Any]:
     """Handle AWS API errors and return JSON-serializable error response."""
-    logger.error(f"AWS API error: {str(e)}")
+    logger.error("AWS API error: %s", e)
     return {"error": str(e)}
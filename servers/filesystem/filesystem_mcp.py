@@ -1,25 +1,31 @@
 from fastmcp import FastMCP
-import logging
+import asyncio
+import atexit
 import os
+import re
 import pathlib
 import fnmatch
+import functools
+import hashlib
+import io
+import mmap
 import difflib
 import stat
 import secrets
+import shutil
+import tempfile
+import threading
+import time
 from datetime import datetime
 from pydantic import BaseModel, Field, ValidationError
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
 from config.config_loader import load_mcp_config
-import json
+from config.logging_config import get_file_logger
+from servers.jobs import JobManager
+import orjson
 
 # Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filename="./filesystem-mcp.log",
-    filemode="a"
-)
-logger = logging.getLogger("mcp_server_filesystem")
+logger = get_file_logger("mcp_server_filesystem", "./filesystem-mcp.log")
 
 # Load configuration
 try:
@@ -35,31 +41,54 @@ try:
     SERVER_NAME = server_config["serverName"]
     PORT = server_config["port"]
 except Exception as e:
-    logger.error(f"Failed to load configuration: {str(e)}")
+    logger.error("Failed to load configuration: %s", e)
     raise
 
+# Maximum number of files read_multiple_files reads concurrently
+READ_CONCURRENCY = 32
+# Responses longer than this many characters are spilled to the response
+# cache and returned by reference; fetch them with fetch_cached
+INLINE_MAX = 256 * 1024
+# Spilled responses expire this many seconds after they were last read, and
+# the least recently used are evicted once the cache exceeds SPILL_MAX_BYTES
+SPILL_TTL = 3600
+SPILL_MAX_BYTES = 256 * 1024 * 1024
+# Characters between the byte offsets recorded for a spilled response
+SPILL_INDEX_STEP = 64 * 1024
+# Edits to files larger than this run as pollable background jobs
+LARGE_EDIT_BYTES = 1024 * 1024
+
 # Path validation
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_path(p: str) -> str:
     """Normalize path, handling home directory and ensuring absolute paths."""
     p = p.strip().strip("'\"")
     if p.startswith("~/") or p == "~":
-        p = os.path.join(os.path.expanduser("~"), p[1:])
+        p = os.path.expanduser(p)
     p = os.path.normpath(p)
     if not os.path.isabs(p):
         p = os.path.abspath(os.path.join(os.getcwd(), p))
     return p
 
 
+_ALLOWED_NORM = normalize_path(ALLOWED_DIR)
+_ALLOWED_PREFIX = _ALLOWED_NORM + os.sep
+_ALLOWED_REAL = pathlib.Path(_ALLOWED_NORM).resolve()
+# Kept outside the allowed directory so the tools can never list or edit it
+CACHE_DIR = tempfile.mkdtemp(prefix="mcp-filesystem-cache-")
+atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+
+
 def is_path_within_allowed_directory(absolute_path: str, allowed_dir: str = ALLOWED_DIR) -> bool:
     """Check if absolute_path is within allowed_dir."""
     normalized_path = normalize_path(absolute_path)
-    normalized_allowed = normalize_path(allowed_dir)
-    if not os.path.isabs(normalized_path) or not os.path.isabs(normalized_allowed):
-        raise ValueError("Paths must be absolute")
     if "\x00" in normalized_path:
         return False
+    if allowed_dir == ALLOWED_DIR:
+        return normalized_path == _ALLOWED_NORM or normalized_path.startswith(_ALLOWED_PREFIX)
+    normalized_allowed = normalize_path(allowed_dir)
     if normalized_path == normalized_allowed:
         return True
     return normalized_path.startswith(normalized_allowed + os.sep)
@@ -71,19 +100,14 @@ def validate_path(requested_path: str, allowed_dir: str = ALLOWED_DIR) -> str:
     if not is_path_within_allowed_directory(absolute_path, allowed_dir):
         raise ValueError(
             f"Access denied - path outside allowed directory: {absolute_path} not in {allowed_dir}")
-    try:
-        real_path = os.path.realpath(absolute_path)
-        if not is_path_within_allowed_directory(real_path, allowed_dir):
-            raise ValueError(
-                f"Access denied - symlink target outside allowed directory: {real_path}")
-        return real_path
-    except FileNotFoundError:
-        parent_dir = os.path.dirname(absolute_path)
-        real_parent = os.path.realpath(parent_dir)
-        if not is_path_within_allowed_directory(real_parent, allowed_dir):
-            raise ValueError(
-                f"Access denied - parent directory outside allowed directory: {real_parent}")
-        return absolute_path
+    allowed_root = _ALLOWED_REAL if allowed_dir == ALLOWED_DIR else pathlib.Path(
+        normalize_path(allowed_dir)).resolve()
+    # Resolves symlinks in every existing component; missing ones are kept as-is
+    real_path = pathlib.Path(absolute_path).resolve()
+    if not real_path.is_relative_to(allowed_root):
+        raise ValueError(
+            f"Access denied - symlink target outside allowed directory: {real_path}")
+    return str(real_path)
 
 # Schema definitions using Pydantic
 
@@ -150,12 +174,28 @@ class GetFileInfoArgs(BaseModel):
     path: str
 
 
+class PollJobArgs(BaseModel):
+    job_id: str
+
+
+class FetchCachedArgs(BaseModel):
+    cache_id: str = Field(pattern=r"^[0-9a-f]{32}$")
+    offset: int = Field(0, ge=0, description="Character offset to start from")
+    length: int = Field(INLINE_MAX, gt=0, description="Maximum characters to return")
+
+
 # Initialize MCP server
 mcp = FastMCP(SERVER_NAME)
+jobs = JobManager()
 
 # Helper functions
 
 
+def to_json(obj: Any) -> str:
+    """Serialize a tool response with orjson; FastMCP tools return str."""
+    return orjson.dumps(obj).decode()
+
+
 def normalize_line_endings(text: str) -> str:
     """Normalize line endings to \n."""
     return text.replace("\r\n", "\n")
@@ -188,49 +228,73 @@ async def get_file_stats(file_path: str) -> Dict[str, Any]:
     }
 
 
-async def search_files(root_path: str, pattern: str, exclude_patterns: List[str] = []) -> List[str]:
-    """Recursively search for files matching pattern."""
+def search_directory(root_path: str, pattern: str, exclude_patterns: List[str] = []) -> List[str]:
+    """Recursively search for files matching pattern with a single scandir pass per directory.
+
+    The pattern is a case-insensitive substring of the file name; exclude
+    patterns are globs on the path relative to root_path.
+
+    Symlinked directories are skipped entirely: they are neither matched nor
+    descended into, so the walk never leaves root_path, which the caller has
+    already validated.
+    """
     results = []
     pattern = pattern.lower()
-    for root, _, files in os.walk(root_path):
-        if not is_path_within_allowed_directory(root, ALLOWED_DIR):
+    # All exclude globs combined into a single regex
+    excludes = None
+    if exclude_patterns:
+        excludes = re.compile("|".join(
+            fnmatch.translate(os.path.normcase(exclude)) for exclude in exclude_patterns))
+    pending = [root_path]
+    while pending:
+        current = pending.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                        continue
+                    if excludes and excludes.match(os.path.normcase(
+                            os.path.relpath(entry.path, root_path))):
+                        continue
+                    if pattern in entry.name.lower():
+                        results.append(entry.path)
+        except OSError:
             continue
-        for file in files:
-            full_path = os.path.join(root, file)
-            relative_path = os.path.relpath(full_path, root_path)
-            if any(fnmatch.fnmatch(relative_path, exclude) for exclude in exclude_patterns):
-                continue
-            if pattern in file.lower():
-                results.append(full_path)
+        # Visit subdirectories in listing order, like a top-down os.walk
+        pending.extend(reversed(subdirs))
     return results
 
 
+def read_tail(file_path: str, num_lines: int) -> str:
+    """Return the last N lines of a file by scanning a memory map backwards.
+
+    Blank lines count as lines, so the result matches joining the last N
+    entries of readlines() with their line endings removed.
+    """
+    if num_lines <= 0 or os.stat(file_path).st_size == 0:
+        return ""
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = len(mm)
+        # The final line ending terminates the last line rather than starting another
+        if mm[end - 2:end] == b"\r\n":
+            end -= 2
+        elif mm[end - 1:end] == b"\n":
+            end -= 1
+        start = end
+        for _ in range(num_lines):
+            start = mm.rfind(b"\n", 0, start)
+            if start == -1:
+                break
+        text = mm[start + 1:end].decode("utf-8")
+    return normalize_line_endings(text)
+
+
 async def tail_file(file_path: str, num_lines: int) -> str:
     """Get last N lines of a file efficiently."""
-    chunk_size = 1024
-    stats = os.stat(file_path)
-    if stats.st_size == 0:
-        return ""
-    with open(file_path, "r", encoding="utf-8") as f:
-        lines = []
-        position = stats.st_size
-        lines_found = 0
-        remaining_text = ""
-        while position > 0 and lines_found < num_lines:
-            size = min(chunk_size, position)
-            position -= size
-            f.seek(position)
-            chunk = f.read(size)
-            chunk_text = chunk + remaining_text
-            chunk_lines = normalize_line_endings(chunk_text).splitlines()
-            if position > 0:
-                remaining_text = chunk_lines[0]
-                chunk_lines = chunk_lines[1:]
-            for line in reversed(chunk_lines):
-                if lines_found < num_lines:
-                    lines.insert(0, line)
-                    lines_found += 1
-        return "\n".join(lines)
+    return await asyncio.to_thread(read_tail, file_path, num_lines)
 
 
 async def head_file(file_path: str, num_lines: int) -> str:
@@ -244,69 +308,262 @@ async def head_file(file_path: str, num_lines: int) -> str:
         return "\n".join(lines)
 
 
-async def apply_file_edits(file_path: str, edits: List[EditOperation], dry_run: bool = False) -> str:
-    """Apply line-based edits and return a unified diff."""
+def find_edit_span(content: str, edit: EditOperation) -> Optional[Tuple[int, int, str]]:
+    """Locate an edit in normalized content and return (start, end, replacement).
+
+    An exact substring match is tried first; otherwise whole lines are matched
+    ignoring leading/trailing whitespace. When the match starts a line, the
+    replacement's first line takes over that line's indentation.
+    """
+    old_text = normalize_line_endings(edit.oldText)
+    new_text = normalize_line_endings(edit.newText)
+    if not old_text.strip():
+        return None
+    idx = content.find(old_text)
+    if idx != -1:
+        line_start = content.rfind("\n", 0, idx) + 1
+        if content[line_start:idx].strip():
+            # Match starts mid-line, so there is no indentation to carry over
+            return idx, idx + len(old_text), new_text
+        start, end = line_start, idx + len(old_text)
+        new_lines = new_text.split("\n")
+    else:
+        pattern = "\n".join(
+            r"[ \t]*" + re.escape(line.strip()) + r"[ \t]*" for line in old_text.splitlines())
+        match = re.search(f"^{pattern}$", content, re.MULTILINE)
+        if match is None:
+            return None
+        start, end = match.span()
+        new_lines = new_text.splitlines()
+    if not new_lines or new_lines == [""]:
+        return start, end, ""
+    matched = content[start:end]
+    indent = matched[:len(matched) - len(matched.lstrip(" \t"))]
+    new_lines[0] = indent + new_lines[0].lstrip()
+    return start, end, "\n".join(new_lines)
+
+
+def write_file_atomic(file_path: str, content: Union[str, bytes]) -> None:
+    """Write content to a same-directory temp file and swap it into place."""
+    data = memoryview(content.encode("utf-8") if isinstance(content, str) else content)
+    temp_path = f"{file_path}.{secrets.token_hex(16)}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        os.replace(temp_path, file_path)
+    except Exception:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SpillCache:
+    """
+    Large responses stored as UTF-8 files for fetch_cached to page through.
+
+    The byte offset of every SPILL_INDEX_STEP-th character is kept in memory,
+    so a page is read by seeking near its start instead of decoding the
+    whole file.
+    """
+
+    def __init__(self, directory: str, ttl: float = SPILL_TTL, max_bytes: int = SPILL_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # cache_id -> (last used, length in characters, byte offsets)
+        self._entries: Dict[str, Tuple[float, int, List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, cache_id: str) -> str:
+        return os.path.join(self.directory, cache_id)
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used until under max_bytes. Call with the lock held."""
+        cutoff = time.monotonic() - self.ttl
+        by_age = sorted(self._entries.items(), key=lambda item: item[1][0])
+        total = sum(entry[2][-1] for _, entry in by_age)
+        for cache_id, (last_used, _, offsets) in by_age:
+            if last_used >= cutoff and total <= self.max_bytes:
+                break
+            del self._entries[cache_id]
+            total -= offsets[-1]
+            try:
+                os.unlink(self.path(cache_id))
+            except OSError:
+                pass
+
+    def put(self, content: str) -> str:
+        """Store content under its hash and return the cache id."""
+        chunks = [content[i:i + SPILL_INDEX_STEP].encode("utf-8")
+                  for i in range(0, len(content), SPILL_INDEX_STEP)]
+        offsets = [0]
+        for chunk in chunks:
+            offsets.append(offsets[-1] + len(chunk))
+        data = b"".join(chunks)
+        cache_id = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._lock:
+            if cache_id in self._entries:
+                self._entries[cache_id] = (time.monotonic(), len(content), offsets)
+                return cache_id
+        write_file_atomic(self.path(cache_id), data)
+        with self._lock:
+            self._entries[cache_id] = (time.monotonic(), len(content), offsets)
+            self._evict()
+        return cache_id
+
+    def read(self, cache_id: str, offset: int, length: int) -> Optional[Tuple[str, int]]:
+        """Return up to length characters from offset and the total length, or None if the id is unknown or expired."""
+        with self._lock:
+            entry = self._entries.get(cache_id)
+            if entry is None or entry[0] < time.monotonic() - self.ttl:
+                return None
+            _, total, offsets = entry
+            self._entries[cache_id] = (time.monotonic(), total, offsets)
+        start = min(offset, total)
+        end = min(offset + length, total)
+        first = start // SPILL_INDEX_STEP
+        last = min(-(-end // SPILL_INDEX_STEP), len(offsets) - 1)
+        with open(self.path(cache_id), "rb") as f:
+            f.seek(offsets[first])
+            text = f.read(offsets[last] - offsets[first]).decode("utf-8")
+        base = first * SPILL_INDEX_STEP
+        return text[start - base:end - base], total
+
+
+response_cache = SpillCache(CACHE_DIR)
+
+
+async def content_response(content: str) -> str:
+    """Return content inline, or a reference to the cached copy when it is too large."""
+    if len(content) <= INLINE_MAX:
+        return to_json({"content": content})
+    cache_id = await asyncio.to_thread(response_cache.put, content)
+    return to_json({
+        "content_url": pathlib.Path(response_cache.path(cache_id)).as_uri(),
+        "cache_id": cache_id,
+        "length": len(content),
+        "message": f"Content exceeds {INLINE_MAX} characters; use fetch_cached with this cache_id to read it in parts"
+    })
+
+
+def splice_edits(content: str, edits: List[EditOperation]) -> Optional[str]:
+    """Apply independent edits to content in a single pass.
+
+    Every edit is located in the original content and the result is built once
+    from the sorted spans. Returns None when an edit has no exact match (the
+    whitespace-tolerant match depends on the text around it), when an earlier
+    edit touches the line a later edit matches on, or when an earlier
+    replacement together with its surroundings contains text a later edit
+    targets; the caller then applies the edits sequentially.
+    """
+    spans = []
+    for edit in edits:
+        old_text = normalize_line_endings(edit.oldText)
+        idx = content.find(old_text)
+        if idx == -1:
+            return None
+        span = find_edit_span(content, edit)
+        if span is None:
+            return None
+        # The replacement's indentation depends on the line up to the match,
+        # so no earlier edit may touch that line or the matched text
+        line_start = content.rfind("\n", 0, idx) + 1
+        # Applied in order, this edit would find its text first wherever an
+        # earlier replacement creates it, including across its boundaries
+        reach = len(old_text) - 1
+        for start, end, replacement in spans:
+            if start <= span[1] and end >= line_start:
+                return None
+            window = content[max(start - reach, 0):start] + \
+                replacement + content[end:end + reach]
+            if old_text in window:
+                return None
+        spans.append(span)
+    spans.sort()
+    out = io.StringIO()
+    cursor = 0
+    for start, end, replacement in spans:
+        if start < cursor:
+            return None
+        out.write(content[cursor:start])
+        out.write(replacement)
+        cursor = end
+    out.write(content[cursor:])
+    return out.getvalue()
+
+
+def edit_file_contents(file_path: str, edits: List[EditOperation], dry_run: bool = False) -> str:
+    """Read a file, apply line-based edits, write it back, and return a unified diff."""
     with open(file_path, "r", encoding="utf-8") as f:
         content = normalize_line_endings(f.read())
-    modified_content = content
-    for edit in edits:
-        old_lines = normalize_line_endings(edit.oldText).splitlines()
-        content_lines = modified_content.splitlines()
-        match_found = False
-        for i in range(len(content_lines) - len(old_lines) + 1):
-            potential_match = content_lines[i:i + len(old_lines)]
-            if all(old.strip() == content.strip() for old, content in zip(old_lines, potential_match)):
-                original_indent = content_lines[i].split(
-                    old_lines[0].strip())[0]
-                new_lines = normalize_line_endings(edit.newText).splitlines()
-                new_lines[0] = original_indent + new_lines[0].lstrip()
-                content_lines[i:i + len(old_lines)] = new_lines
-                modified_content = "\n".join(content_lines)
-                match_found = True
-                break
-        if not match_found:
-            raise ValueError(
-                f"Could not find exact match for edit: {edit.oldText}")
+    modified_content = splice_edits(content, edits)
+    if modified_content is None:
+        # Edits depend on each other, so apply them one at a time
+        modified_content = content
+        for edit in edits:
+            span = find_edit_span(modified_content, edit)
+            if span is None:
+                raise ValueError(
+                    f"Could not find exact match for edit: {edit.oldText}")
+            start, end, replacement = span
+            modified_content = modified_content[:start] + \
+                replacement + modified_content[end:]
     diff = create_unified_diff(content, modified_content, file_path)
     num_backticks = 3
     while "```" * num_backticks in diff:
         num_backticks += 1
     formatted_diff = f"{'```' * num_backticks}diff\n{diff}\n{'```' * num_backticks}\n"
     if not dry_run:
-        temp_path = f"{file_path}.{secrets.token_hex(16)}.tmp"
-        try:
-            with open(temp_path, "w", encoding="utf-8") as f:
-                f.write(modified_content)
-            os.rename(temp_path, file_path)
-        except Exception as e:
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-            raise e
+        write_file_atomic(file_path, modified_content)
     return formatted_diff
 
 
+async def apply_file_edits(file_path: str, edits: List[EditOperation], dry_run: bool = False) -> str:
+    """Apply line-based edits in a worker thread and return a unified diff.
+
+    Reading, splicing, diffing, and writing a large file all take time, so
+    none of it runs on the event loop.
+    """
+    return await asyncio.to_thread(edit_file_contents, file_path, edits, dry_run)
+
+
+def read_file_section(file_path: str) -> str:
+    """Read one file for read_multiple_files, returning its section or an error line."""
+    try:
+        valid_path = validate_path(file_path)
+        with open(valid_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        return f"{file_path}:\n{content}\n"
+    except Exception as e:
+        return f"{file_path}: Error - {str(e)}"
+
+
+_UNIT_TABLE = [(1 << 40, "TB"), (1 << 30, "GB"), (1 << 20, "MB"), (1 << 10, "KB")]
+
+
 def format_size(bytes: int) -> str:
     """Format file size in human-readable format."""
-    units = ['B', 'KB', 'MB', 'GB', 'TB']
-    if bytes == 0:
-        return '0 B'
-    i = int((bytes).bit_length() / 10)
-    if i == 0:
-        return f"{bytes} {units[i]}"
-    return f"{bytes / (1024 ** i):.2f} {units[i]}"
+    for scale, unit in _UNIT_TABLE:
+        if bytes >= scale:
+            return f"{bytes / scale:.2f} {unit}"
+    return f"{bytes} B"
 
 # Tool definitions
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def read_file(args: Dict[str, Any]) -> str:
     """Read the complete contents of a file from the file system."""
     try:
-        parsed = ReadFileArgs(**args)
+        parsed = ReadFileArgs.model_validate(args)
         if parsed.head and parsed.tail:
-            return json.dumps({"error": "Cannot specify both head and tail parameters"})
+            return to_json({"error": "Cannot specify both head and tail parameters"})
         valid_path = validate_path(parsed.path)
         if parsed.tail:
             content = await tail_file(valid_path, parsed.tail)
@@ -315,121 +572,107 @@ async def read_file(args: Dict[str, Any]) -> str:
         else:
             with open(valid_path, "r", encoding="utf-8") as f:
                 content = f.read()
-        return json.dumps({"content": content})
+        return await content_response(content)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def read_multiple_files(args: Dict[str, Any]) -> str:
     """Read the contents of multiple files simultaneously."""
     try:
-        parsed = ReadMultipleFilesArgs(**args)
-        results = []
-        for file_path in parsed.paths:
-            try:
-                valid_path = validate_path(file_path)
-                with open(valid_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                results.append(f"{file_path}:\n{content}\n")
-            except Exception as e:
-                results.append(f"{file_path}: Error - {str(e)}")
-        return json.dumps({"content": "\n---\n".join(results)})
+        parsed = ReadMultipleFilesArgs.model_validate(args)
+        semaphore = asyncio.Semaphore(READ_CONCURRENCY)
+
+        async def read_bounded(file_path: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(read_file_section, file_path)
+        results = await asyncio.gather(*(read_bounded(file_path) for file_path in parsed.paths))
+        return await content_response("\n---\n".join(results))
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def write_file(args: Dict[str, Any]) -> str:
     """Create or overwrite a file with new content."""
     try:
-        parsed = WriteFileArgs(**args)
+        parsed = WriteFileArgs.model_validate(args)
         valid_path = validate_path(parsed.path)
-        temp_path = f"{valid_path}.{secrets.token_hex(16)}.tmp"
-        try:
-            with open(temp_path, "x", encoding="utf-8") as f:
-                f.write(parsed.content)
-            os.rename(temp_path, valid_path)
-        except FileExistsError:
-            with open(temp_path, "w", encoding="utf-8") as f:
-                f.write(parsed.content)
-            os.rename(temp_path, valid_path)
-        except Exception as e:
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-            raise e
-        return json.dumps({"message": f"Successfully wrote to {parsed.path}"})
+        await asyncio.to_thread(write_file_atomic, valid_path, parsed.content)
+        return to_json({"message": f"Successfully wrote to {parsed.path}"})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def edit_file(args: Dict[str, Any]) -> str:
     """Make line-based edits to a text file."""
     try:
-        parsed = EditFileArgs(**args)
+        parsed = EditFileArgs.model_validate(args)
         valid_path = validate_path(parsed.path)
-        result = await apply_file_edits(valid_path, parsed.edits, parsed.dryRun)
-        return json.dumps({"content": result})
+        if os.path.getsize(valid_path) > LARGE_EDIT_BYTES:
+            job_id, result = await jobs.run(apply_file_edits(valid_path, parsed.edits, parsed.dryRun))
+            if job_id:
+                return to_json({"job_id": job_id, "status": "pending"})
+        else:
+            result = await apply_file_edits(valid_path, parsed.edits, parsed.dryRun)
+        return to_json({"content": result})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def create_directory(args: Dict[str, Any]) -> str:
     """Create a new directory or ensure it exists."""
     try:
-        parsed = CreateDirectoryArgs(**args)
+        parsed = CreateDirectoryArgs.model_validate(args)
         valid_path = validate_path(parsed.path)
         os.makedirs(valid_path, exist_ok=True)
-        return json.dumps({"message": f"Successfully created directory {parsed.path}"})
+        return to_json({"message": f"Successfully created directory {parsed.path}"})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def list_directory(args: Dict[str, Any]) -> str:
     """Get a listing of files and directories."""
     try:
-        parsed = ListDirectoryArgs(**args)
+        parsed = ListDirectoryArgs.model_validate(args)
         valid_path = validate_path(parsed.path)
-        entries = os.listdir(valid_path)
-        formatted = []
-        for entry in entries:
-            entry_path = os.path.join(valid_path, entry)
-            prefix = "[DIR]" if os.path.isdir(entry_path) else "[FILE]"
-            formatted.append(f"{prefix} {entry}")
-        return json.dumps({"content": "\n".join(formatted)})
+        with os.scandir(valid_path) as it:
+            formatted = [
+                f"{'[DIR]' if entry.is_dir() else '[FILE]'} {entry.name}" for entry in it]
+        return to_json({"content": "\n".join(formatted)})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def list_directory_with_sizes(args: Dict[str, Any]) -> str:
     """Get a listing of files and directories with sizes."""
     try:
-        parsed = ListDirectoryWithSizesArgs(**args)
+        parsed = ListDirectoryWithSizesArgs.model_validate(args)
         valid_path = validate_path(parsed.path)
         entries = []
-        for entry in os.listdir(valid_path):
-            entry_path = os.path.join(valid_path, entry)
-            try:
-                stats = os.stat(entry_path)
-                entries.append({
-                    "name": entry,
-                    "isDirectory": os.path.isdir(entry_path),
-                    "size": stats.st_size,
-                    "mtime": stats.st_mtime
-                })
-            except:
-                entries.append({
-                    "name": entry,
-                    "isDirectory": os.path.isdir(entry_path),
-                    "size": 0,
-                    "mtime": 0
-                })
+        with os.scandir(valid_path) as it:
+            for entry in it:
+                is_dir = entry.is_dir()
+                try:
+                    stats = entry.stat()
+                    entries.append({
+                        "name": entry.name,
+                        "isDirectory": is_dir,
+                        "size": stats.st_size,
+                        "mtime": stats.st_mtime
+                    })
+                except OSError:
+                    entries.append({
+                        "name": entry.name,
+                        "isDirectory": is_dir,
+                        "size": 0,
+                        "mtime": 0
+                    })
         entries.sort(key=lambda e: e["size"] if parsed.sortBy ==
                      "size" else e["name"], reverse=(parsed.sortBy == "size"))
         formatted = [
@@ -439,77 +682,126 @@ async def list_directory_with_sizes(args: Dict[str, Any]) -> str:
         total_size = sum(e["size"] for e in entries if not e["isDirectory"])
         formatted.extend(
             ["", f"Total: {total_files} files, {total_dirs} directories", f"Combined size: {format_size(total_size)}"])
-        return json.dumps({"content": "\n".join(formatted)})
+        return to_json({"content": "\n".join(formatted)})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def directory_tree(args: Dict[str, Any]) -> str:
-    """Get a recursive tree view of files and directories."""
+    """Get a recursive tree view of files and directories. Symlinked directories are shown without children."""
     try:
-        parsed = DirectoryTreeArgs(**args)
+        parsed = DirectoryTreeArgs.model_validate(args)
 
-        async def build_tree(current_path: str) -> List[Dict[str, Any]]:
+        def scan_directory(current_path: str) -> List[Tuple[str, str, bool, bool]]:
             valid_path = validate_path(current_path)
+            with os.scandir(valid_path) as it:
+                # (name, path, is a directory, is a real directory to descend into)
+                return [(entry.name, entry.path, entry.is_dir(), entry.is_dir() and not entry.is_symlink())
+                        for entry in it]
+
+        async def build_tree(current_path: str) -> List[Dict[str, Any]]:
+            scanned = await asyncio.to_thread(scan_directory, current_path)
+            subtrees = iter(await asyncio.gather(
+                *(build_tree(path) for _, path, _, descend in scanned if descend)))
             entries = []
-            for entry in os.listdir(valid_path):
-                entry_path = os.path.join(valid_path, entry)
-                entry_data = {"name": entry, "type": "directory" if os.path.isdir(
-                    entry_path) else "file"}
-                if os.path.isdir(entry_path):
-                    entry_data["children"] = await build_tree(entry_path)
+            for name, _, is_dir, descend in scanned:
+                entry_data = {"name": name,
+                              "type": "directory" if is_dir else "file"}
+                if descend:
+                    entry_data["children"] = next(subtrees)
                 entries.append(entry_data)
             return entries
         tree_data = await build_tree(parsed.path)
-        return json.dumps({"content": json.dumps(tree_data, indent=2)})
+        return await content_response(orjson.dumps(tree_data, option=orjson.OPT_INDENT_2).decode())
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def move_file(args: Dict[str, Any]) -> str:
     """Move or rename files and directories."""
     try:
-        parsed = MoveFileArgs(**args)
+        parsed = MoveFileArgs.model_validate(args)
         valid_source = validate_path(parsed.source)
         valid_dest = validate_path(parsed.destination)
         os.rename(valid_source, valid_dest)
-        return json.dumps({"message": f"Successfully moved {parsed.source} to {parsed.destination}"})
+        return to_json({"message": f"Successfully moved {parsed.source} to {parsed.destination}"})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def search_files(args: Dict[str, Any]) -> str:
     """Recursively search for files matching a pattern."""
     try:
-        parsed = SearchFilesArgs(**args)
+        parsed = SearchFilesArgs.model_validate(args)
         valid_path = validate_path(parsed.path)
-        results = await search_files(valid_path, parsed.pattern, parsed.excludePatterns)
-        return json.dumps({"content": "\n".join(results) if results else "No matches found"})
+
+        async def search() -> str:
+            results = await asyncio.to_thread(
+                search_directory, valid_path, parsed.pattern, parsed.excludePatterns)
+            return "\n".join(results) if results else "No matches found"
+        job_id, content = await jobs.run(search())
+        if job_id:
+            return to_json({"job_id": job_id, "status": "pending"})
+        return to_json({"content": content})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def get_file_info(args: Dict[str, Any]) -> str:
     """Retrieve detailed metadata about a file or directory."""
     try:
-        parsed = GetFileInfoArgs(**args)
+        parsed = GetFileInfoArgs.model_validate(args)
         valid_path = validate_path(parsed.path)
         info = await get_file_stats(valid_path)
         formatted = "\n".join(f"{key}: {value}" for key, value in info.items())
-        return json.dumps({"content": formatted})
+        return to_json({"content": formatted})
+    except Exception as e:
+        return to_json({"error": str(e)})
+
+
+@mcp.tool(output_schema=None)
+async def poll_job(args: Dict[str, Any]) -> str:
+    """Check on a long-running search or edit and collect its result."""
+    try:
+        parsed = PollJobArgs.model_validate(args)
+        status = jobs.poll(parsed.job_id)
+        if "result" in status:
+            status["content"] = status.pop("result")
+        return to_json(status)
+    except Exception as e:
+        return to_json({"error": str(e)})
+
+
+@mcp.tool(output_schema=None)
+async def fetch_cached(args: Dict[str, Any]) -> str:
+    """Read part of a large response that was returned by reference."""
+    try:
+        parsed = FetchCachedArgs.model_validate(args)
+        page = await asyncio.to_thread(
+            response_cache.read, parsed.cache_id, parsed.offset, parsed.length)
+        if page is None:
+            return to_json({"error": f"Unknown cache id: {parsed.cache_id}"})
+        content, total = page
+        end = parsed.offset + parsed.length
+        return to_json({
+            "content": content,
+            "offset": parsed.offset,
+            "next_offset": end if end < total else None,
+            "length": total
+        })
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def list_allowed_directories(args: Dict[str, Any]) -> str:
     """List directories the server is allowed to access."""
-    return json.dumps({"content": f"Allowed directories:\n{ALLOWED_DIR}"})
+    return to_json({"content": f"Allowed directories:\n{ALLOWED_DIR}"})
 
 if __name__ == "__main__":
-    logger.info(f"Starting {SERVER_NAME} on http://localhost:{PORT}")
+    logger.info("Starting %s on http://localhost:%s", SERVER_NAME, PORT)
     mcp.run(transport="http", port=PORT, host="0.0.0.0")
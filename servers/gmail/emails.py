@@ -1,20 +1,39 @@
 from fastmcp import FastMCP
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
-from email.message import EmailMessage
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
-from email.header import decode_header
-from base64 import urlsafe_b64decode
-from email import message_from_bytes
+from typing import Dict, Any, Optional, List, Literal
+from email.message import EmailMessage, Message
+from email.parser import BytesFeedParser
+from email import policy
+from pathlib import Path
+from functools import lru_cache
 import json
 import asyncio
-import smtplib
-from .utils import get_gmail_service, get_user_email, handle_gmail_error, load_smtp_config, validate_pdf_attachment
+from googleapiclient.errors import HttpError
+# pybase64 (SIMD base64) is optional; fall back to the standard library
+try:
+    from pybase64 import urlsafe_b64decode
+except ImportError:
+    from base64 import urlsafe_b64decode
+from .utils import get_gmail_service_async, get_user_email, handle_gmail_error, load_smtp_config, send_smtp_message, validate_pdf_attachment
 
 mcp = FastMCP("GmailEmails")
 
+UNREAD_QUERY = "in:inbox is:unread category:primary"
+# Gmail accepts at most 100 calls per batch request
+BATCH_SIZE = 100
+METADATA_HEADERS = ["From", "Subject", "Date"]
+# Largest page messages.list allows
+LIST_PAGE_SIZE = 500
+LIST_FIELDS = "messages/id,nextPageToken"
+READ_HEADERS = ["Subject", "From", "To", "Date"]
+# Partial responses: only the parts of a message read_email uses
+METADATA_FIELDS = "id,snippet,payload/headers"
+FULL_FIELDS = "id,payload(mimeType,headers,body/data,parts)"
+# Bytes of a raw message handed to the MIME parser at a time
+PARSE_CHUNK_SIZE = 64 * 1024
+# Longest header value whose decoding is memoized
+MAX_CACHED_HEADER = 512
+
 
 class SendEmailArgs(BaseModel):
     recipient_id: str = Field(description="Recipient email address")
@@ -24,8 +43,17 @@ class SendEmailArgs(BaseModel):
         default=None, description="Path to PDF attachment (optional)")
 
 
+class GetUnreadEmailsBatchArgs(BaseModel):
+    max_results: Optional[int] = Field(
+        default=100, ge=1, description="Maximum number of unread emails to return")
+
+
 class ReadEmailArgs(BaseModel):
     email_id: str = Field(description="Email ID")
+    format: Literal["metadata", "full", "raw"] = Field(
+        default="raw",
+        description="'metadata' returns only headers and snippet without marking the email read; "
+                    "'full' and 'raw' also return the plain-text body")
 
 
 class TrashEmailArgs(BaseModel):
@@ -36,119 +64,279 @@ class MarkEmailAsReadArgs(BaseModel):
     email_id: str = Field(description="Email ID")
 
 
-def decode_mime_header(header: str) -> str:
-    """Decode encoded email headers."""
-    decoded_parts = decode_header(header)
-    decoded_string = ""
-    for part, encoding in decoded_parts:
-        if isinstance(part, bytes):
-            decoded_string += part.decode(encoding or "utf-8")
-        else:
-            decoded_string += part
-    return decoded_string
-
-
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def send_email(args: Dict[str, Any]) -> str:
     """Send an email to a recipient using SMTP, with optional PDF attachment."""
     try:
-        parsed = SendEmailArgs(**args)
-        config = load_smtp_config()
-        smtp_server = config["smtp_server"]
-        smtp_port = config["smtp_port"]
+        parsed = SendEmailArgs.model_validate(args)
+        config = await asyncio.to_thread(load_smtp_config)
         email = config["email"]
-        app_password = config["app_password"]
 
         # Create MIME message
-        msg = MIMEMultipart()
+        msg = EmailMessage()
         msg["To"] = parsed.recipient_id
         msg["From"] = email
         msg["Subject"] = parsed.subject
-        msg.attach(MIMEText(parsed.message, "plain"))
+        msg.set_content(parsed.message)
 
         # Add PDF attachment if provided
         if parsed.attachment_path:
-            filename = validate_pdf_attachment(parsed.attachment_path)
-            with open(parsed.attachment_path, "rb") as fp:
-                att = MIMEApplication(fp.read(), _subtype="pdf")
-                att.add_header("Content-Disposition",
-                               "attachment", filename=filename)
-                msg.attach(att)
+            filename, _ = await asyncio.to_thread(validate_pdf_attachment, parsed.attachment_path)
+            data = await asyncio.to_thread(Path(parsed.attachment_path).read_bytes)
+            msg.add_attachment(data, maintype="application",
+                               subtype="pdf", filename=filename)
 
         # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(email, app_password)
-            server.send_message(msg)
+        await send_smtp_message(msg)
 
         return json.dumps({"status": "success", "message": f"Email sent to {parsed.recipient_id}"})
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 
-@mcp.tool()
+def metadata_request(service: Any, message_id: str) -> Any:
+    """Build a messages.get request for a message's headers and snippet."""
+    return service.users().messages().get(
+        userId="me", id=message_id, format="metadata", metadataHeaders=METADATA_HEADERS)
+
+
+def header_map(payload: Dict[str, Any]) -> Dict[str, str]:
+    """Map lower-cased header names to values for an API message payload."""
+    return {header["name"].lower(): header["value"]
+            for header in payload.get("headers", [])}
+
+
+def _decode(header: str) -> str:
+    return str(policy.default.header_factory("unstructured", header))
+
+
+# Subjects and senders recur across threads and mailing lists, so decoded
+# values are memoized; long one-off headers bypass the cache
+_decode_cached = lru_cache(maxsize=4096)(_decode)
+
+
+def decode_mime_header(header: str) -> str:
+    """Decode RFC 2047 encoded words in a header value."""
+    if len(header) > MAX_CACHED_HEADER:
+        return _decode(header)
+    return _decode_cached(header)
+
+
+def read_headers(payload: Dict[str, Any]) -> Dict[str, str]:
+    """Return the decoded subject, from, to, and date headers of an API message payload."""
+    headers = header_map(payload)
+    return {name: decode_mime_header(headers.get(name, ""))
+            for name in ("subject", "from", "to", "date")}
+
+
+def find_text_part(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the first text/plain part with a body, else the first text/html part."""
+    html_part = None
+    pending = [payload]
+    while pending:
+        part = pending.pop()
+        data = part.get("body", {}).get("data")
+        if data and part.get("mimeType") == "text/plain":
+            return part
+        if data and html_part is None and part.get("mimeType") == "text/html":
+            html_part = part
+        pending.extend(reversed(part.get("parts", [])))
+    return html_part
+
+
+def part_charset(part: Dict[str, Any]) -> Optional[str]:
+    """Return the charset parameter of an API message part's Content-Type header."""
+    content_type = header_map(part).get("content-type")
+    if not content_type:
+        return None
+    message = Message()
+    message["Content-Type"] = content_type
+    return message.get_content_charset()
+
+
+def decode_text(data: bytes, charset: Optional[str]) -> str:
+    """Decode a body with its declared charset, falling back to UTF-8 if the charset is unknown."""
+    try:
+        return data.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+def parse_raw_message(data: bytes) -> EmailMessage:
+    """Parse a raw RFC 822 message, feeding the parser in chunks.
+
+    Feeding chunks avoids decoding the whole message into one string up
+    front; part payloads are only decoded when they are read.
+    """
+    parser = BytesFeedParser(policy=policy.default)
+    for start in range(0, len(data), PARSE_CHUNK_SIZE):
+        parser.feed(data[start:start + PARSE_CHUNK_SIZE])
+    return parser.close()
+
+
+def summarize_message(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a metadata-format message into id, headers, and snippet."""
+    headers = header_map(msg.get("payload", {}))
+    return {
+        "id": msg["id"],
+        "from": headers.get("from", ""),
+        "subject": headers.get("subject", ""),
+        "date": headers.get("date", ""),
+        "snippet": msg.get("snippet", "")
+    }
+
+
+async def list_unread_messages(service: Any, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+    """List unread inbox message stubs, following page tokens up to max_results.
+
+    Each page token is only known from the previous page, so pages cannot be
+    fetched concurrently; requesting the largest page size with a partial
+    response keeps the number and size of round-trips down instead.
+    """
+    page_size = LIST_PAGE_SIZE if max_results is None else min(
+        max_results, LIST_PAGE_SIZE)
+
+    def list_page(page_token: Optional[str] = None) -> Dict[str, Any]:
+        return service.users().messages().list(
+            userId="me", q=UNREAD_QUERY, maxResults=page_size,
+            pageToken=page_token, fields=LIST_FIELDS).execute()
+
+    response = await asyncio.to_thread(list_page)
+    messages = response.get("messages", [])
+    while "nextPageToken" in response and (max_results is None or len(messages) < max_results):
+        response = await asyncio.to_thread(list_page, response["nextPageToken"])
+        messages.extend(response.get("messages", []))
+    return messages if max_results is None else messages[:max_results]
+
+
+async def fetch_metadata_batch(service: Any, message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch message metadata with one batch HTTP request per 100 messages.
+
+    Falls back to concurrent individual requests if the batch endpoint
+    rejects the request with HTTP 400.
+    """
+    results = {}
+
+    def collect(request_id: str, response: Dict[str, Any], exception: Optional[Exception]) -> None:
+        if exception is not None:
+            results[request_id] = {"id": request_id, "error": str(exception)}
+        else:
+            results[request_id] = summarize_message(response)
+
+    for start in range(0, len(message_ids), BATCH_SIZE):
+        chunk = message_ids[start:start + BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=collect)
+        for message_id in chunk:
+            batch.add(metadata_request(service, message_id),
+                      request_id=message_id)
+        try:
+            await asyncio.to_thread(batch.execute)
+        except HttpError as e:
+            if getattr(e.resp, "status", None) != 400:
+                raise
+            responses = await asyncio.gather(
+                *(asyncio.to_thread(metadata_request(service, message_id).execute) for message_id in chunk),
+                return_exceptions=True)
+            for message_id, response in zip(chunk, responses):
+                if isinstance(response, Exception):
+                    collect(message_id, None, response)
+                else:
+                    collect(message_id, response, None)
+    return results
+
+
+async def mark_as_read(service: Any, message_id: str) -> None:
+    """Remove the UNREAD label from a message.
+
+    Called only after the message was fetched and its body parsed, so a
+    failed read never leaves the message marked as read.
+    """
+    await asyncio.to_thread(
+        service.users().messages().modify(userId="me", id=message_id,
+                                          body={"removeLabelIds": ["UNREAD"]}).execute
+    )
+
+
+@mcp.tool(output_schema=None)
 async def get_unread_emails(args: Dict[str, Any]) -> str:
     """Retrieve unread emails from the inbox."""
     try:
-        service = get_gmail_service()
-        query = "in:inbox is:unread category:primary"
-        response = await asyncio.to_thread(
-            service.users().messages().list(userId="me", q=query).execute
-        )
-        messages = response.get("messages", [])
-        while "nextPageToken" in response:
-            page_token = response["nextPageToken"]
-            response = await asyncio.to_thread(
-                service.users().messages().list(userId="me", q=query, pageToken=page_token).execute
-            )
-            messages.extend(response.get("messages", []))
+        service = await get_gmail_service_async()
+        messages = await list_unread_messages(service)
         return json.dumps({"messages": [{"id": msg["id"]} for msg in messages]})
     except Exception as e:
         return json.dumps(handle_gmail_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
+async def get_unread_emails_batch(args: Dict[str, Any]) -> str:
+    """Retrieve unread emails with sender, subject, date, and snippet in batched requests."""
+    try:
+        parsed = GetUnreadEmailsBatchArgs.model_validate(args)
+        service = await get_gmail_service_async()
+        messages = await list_unread_messages(service, parsed.max_results)
+        message_ids = [msg["id"] for msg in messages]
+        results = await fetch_metadata_batch(service, message_ids)
+        return json.dumps({"messages": [results[message_id] for message_id in message_ids]})
+    except Exception as e:
+        return json.dumps(handle_gmail_error(e))
+
+
+@mcp.tool(output_schema=None)
 async def read_email(args: Dict[str, Any]) -> str:
     """Retrieve email contents including to, from, subject, and content."""
     try:
-        parsed = ReadEmailArgs(**args)
-        service = get_gmail_service()
-        msg = await asyncio.to_thread(
-            service.users().messages().get(userId="me", id=parsed.email_id, format="raw").execute
-        )
-        raw_data = msg["raw"]
-        decoded_data = urlsafe_b64decode(raw_data)
-        mime_message = message_from_bytes(decoded_data)
-        body = None
-        if mime_message.is_multipart():
-            for part in mime_message.walk():
-                if part.get_content_type() == "text/plain":
-                    body = part.get_payload(decode=True).decode()
-                    break
+        parsed = ReadEmailArgs.model_validate(args)
+        service = await get_gmail_service_async()
+        if parsed.format == "metadata":
+            msg = await asyncio.to_thread(
+                service.users().messages().get(userId="me", id=parsed.email_id, format="metadata",
+                                               metadataHeaders=READ_HEADERS, fields=METADATA_FIELDS).execute
+            )
+            return json.dumps({"snippet": msg.get("snippet", ""),
+                               **read_headers(msg.get("payload", {}))})
+        if parsed.format == "full":
+            msg = await asyncio.to_thread(
+                service.users().messages().get(userId="me", id=parsed.email_id, format="full",
+                                               fields=FULL_FIELDS).execute
+            )
+            payload = msg.get("payload", {})
+            body_part = find_text_part(payload)
+            body = None
+            if body_part is not None:
+                body = decode_text(urlsafe_b64decode(body_part["body"]["data"]),
+                                   part_charset(body_part))
+            email_metadata = {"content": body, **read_headers(payload)}
         else:
-            body = mime_message.get_payload(decode=True).decode()
-        email_metadata = {
-            "content": body,
-            "subject": decode_mime_header(mime_message.get("subject", "")),
-            "from": mime_message.get("from", ""),
-            "to": mime_message.get("to", ""),
-            "date": mime_message.get("date", "")
-        }
-        await asyncio.to_thread(
-            service.users().messages().modify(userId="me", id=parsed.email_id,
-                                              body={"removeLabelIds": ["UNREAD"]}).execute
-        )
+            msg = await asyncio.to_thread(
+                service.users().messages().get(userId="me", id=parsed.email_id, format="raw").execute
+            )
+            mime_message = await asyncio.to_thread(
+                parse_raw_message, urlsafe_b64decode(msg.pop("raw")))
+            body_part = mime_message.get_body(preferencelist=("plain", "html"))
+            body = None
+            if body_part is not None:
+                body = decode_text(body_part.get_payload(decode=True),
+                                   body_part.get_content_charset())
+            email_metadata = {
+                "content": body,
+                "subject": str(mime_message.get("subject", "")),
+                "from": str(mime_message.get("from", "")),
+                "to": str(mime_message.get("to", "")),
+                "date": str(mime_message.get("date", ""))
+            }
+        await mark_as_read(service, parsed.email_id)
         return json.dumps(email_metadata)
     except Exception as e:
         return json.dumps(handle_gmail_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def trash_email(args: Dict[str, Any]) -> str:
     """Move an email to the trash."""
     try:
-        parsed = TrashEmailArgs(**args)
-        service = get_gmail_service()
+        parsed = TrashEmailArgs.model_validate(args)
+        service = await get_gmail_service_async()
         await asyncio.to_thread(
             service.users().messages().trash(userId="me", id=parsed.email_id).execute
         )
@@ -157,16 +345,13 @@ async def trash_email(args: Dict[str, Any]) -> str:
         return json.dumps(handle_gmail_error(e))
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def mark_email_as_read(args: Dict[str, Any]) -> str:
     """Mark an email as read."""
     try:
-        parsed = MarkEmailAsReadArgs(**args)
-        service = get_gmail_service()
-        await asyncio.to_thread(
-            service.users().messages().modify(userId="me", id=parsed.email_id,
-                                              body={"removeLabelIds": ["UNREAD"]}).execute
-        )
+        parsed = MarkEmailAsReadArgs.model_validate(args)
+        service = await get_gmail_service_async()
+        await mark_as_read(service, parsed.email_id)
         return json.dumps({"message": f"Email {parsed.email_id} marked as read"})
     except Exception as e:
         return json.dumps(handle_gmail_error(e))
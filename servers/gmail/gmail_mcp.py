@@ -1,18 +1,12 @@
 from fastmcp import FastMCP
-import logging
 import json
 import os
 from .emails import mcp as emails_mcp
 from config.config_loader import load_mcp_config
+from config.logging_config import get_file_logger
 
 # Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filename="/mnt/d/linux/TheMCP/servers/gmail/gmail-mcp.log",
-    filemode="a"
-)
-logger = logging.getLogger("gmail_mcp")
+logger = get_file_logger("gmail_mcp", "/mnt/d/linux/TheMCP/servers/gmail/gmail-mcp.log")
 
 # Load configuration
 try:
@@ -25,7 +19,7 @@ try:
         raise ValueError(f"Missing serverName in gmail-server configuration")
     SERVER_NAME = server_config["serverName"]
 except Exception as e:
-    logger.error(f"Failed to load configuration: {str(e)}")
+    logger.error("Failed to load configuration: %s", e)
     raise
 
 # Initialize MCP server
@@ -36,9 +30,9 @@ try:
     mcp.mount(emails_mcp, prefix="emails")
     logger.info("Mounted emails subserver")
 except Exception as e:
-    logger.error(f"Failed to mount emails subserver: {str(e)}")
+    logger.error("Failed to mount emails subserver: %s", e)
     raise
 
 if __name__ == "__main__":
-    logger.info(f"Starting {SERVER_NAME}")
+    logger.info("Starting %s", SERVER_NAME)
     # Note: Not running standalone; will be mounted by master server
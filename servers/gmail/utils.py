@@ -1,30 +1,65 @@
-import logging
+import asyncio
+import atexit
 import os
 import json
+import smtplib
+import threading
+import google_auth_httplib2
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from typing import Any, Dict
+from googleapiclient.http import HttpRequest
+from email.message import Message
+from typing import Any, Dict, Optional, Tuple
+from config.logging_config import get_file_logger
 
 # Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filename="./gmail-mcp.log",
-    filemode="a"
-)
-logger = logging.getLogger("gmail_mcp_utils")
+logger = get_file_logger("gmail_mcp_utils", "./gmail-mcp.log")
 
 CREDS_FILE_PATH = "/mnt/d/linux/TheMCP/servers/gmail/credentials.json"
 TOKEN_PATH = "/mnt/d/linux/TheMCP/servers/gmail/token.json"
 SMTP_CONFIG_PATH = "/mnt/d/linux/TheMCP/servers/gmail/smtp_config.json"
 SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
 
+# Gmail service shared by all tool calls, built on first use
+_SERVICE: Optional[Any] = None
+_CREDENTIALS: Optional[Credentials] = None
+_SERVICE_LOCK = threading.Lock()
+# httplib2.Http is not thread-safe, so each worker thread keeps its own
+# authorized connection, reused across calls for keep-alive. Responses are
+# gzip-compressed without extra setup: googleapiclient sends
+# "accept-encoding: gzip, deflate" and a "(gzip)" user-agent on API calls,
+# httplib2 does the same for batch requests, and httplib2 decompresses.
+_THREAD_HTTP = threading.local()
+
+# SMTP settings, read from SMTP_CONFIG_PATH on first use
+_SMTP_CONFIG: Optional[Dict[str, Any]] = None
+_SMTP_CONFIG_LOCK = threading.Lock()
+# SMTP session reused across send_email calls; the lock serializes its use
+_SMTP: Optional[smtplib.SMTP] = None
+_SMTP_LOCK = asyncio.Lock()
+SMTP_TIMEOUT = 30
+# Gmail rejects messages over 25 MB, so larger attachments are refused up front
+MAX_ATTACHMENT_BYTES = 25 * 1024 * 1024
+
 
 def load_smtp_config() -> Dict[str, Any]:
-    """Load SMTP configuration from smtp_config.json."""
+    """Load SMTP configuration from smtp_config.json, reading the file only once."""
+    global _SMTP_CONFIG
+    config = _SMTP_CONFIG
+    if config is not None:
+        return config
+    with _SMTP_CONFIG_LOCK:
+        if _SMTP_CONFIG is None:
+            _SMTP_CONFIG = read_smtp_config()
+        return _SMTP_CONFIG
+
+
+def read_smtp_config() -> Dict[str, Any]:
+    """Read and validate smtp_config.json."""
     try:
         if not os.path.exists(SMTP_CONFIG_PATH):
             raise FileNotFoundError(
@@ -37,12 +72,72 @@ def load_smtp_config() -> Dict[str, Any]:
         logger.info("SMTP configuration loaded successfully")
         return config
     except Exception as e:
-        logger.error(f"Failed to load SMTP config: {str(e)}")
+        logger.error("Failed to load SMTP config: %s", e)
         raise
 
 
-def validate_pdf_attachment(attachment_path: str) -> str:
-    """Validate PDF attachment path and ensure it’s readable."""
+def connect_smtp(config: Dict[str, Any]) -> smtplib.SMTP:
+    """Open an SMTP session, upgrade it with STARTTLS, and log in."""
+    server = smtplib.SMTP(
+        config["smtp_server"], config["smtp_port"], timeout=SMTP_TIMEOUT)
+    try:
+        server.starttls()
+        server.login(config["email"], config["app_password"])
+    except Exception:
+        server.close()
+        raise
+    logger.info("SMTP session opened")
+    return server
+
+
+def close_smtp() -> None:
+    """Close the pooled SMTP session, if any."""
+    global _SMTP
+    server, _SMTP = _SMTP, None
+    if server is not None:
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
+def send_on_pooled_smtp(msg: Message, config: Dict[str, Any]) -> None:
+    """Send msg over the pooled session, reconnecting if it no longer answers NOOP."""
+    global _SMTP
+    if _SMTP is not None:
+        try:
+            healthy = _SMTP.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            healthy = False
+        if not healthy:
+            logger.info("SMTP session dropped, reconnecting")
+            close_smtp()
+    if _SMTP is None:
+        _SMTP = connect_smtp(config)
+    _SMTP.send_message(msg)
+
+
+async def send_smtp_message(msg: Message) -> None:
+    """Send an email through the pooled SMTP session.
+
+    A stale session is replaced before the send starts; a disconnect during
+    the send is raised rather than retried, since the server may already have
+    accepted the message and a retry could deliver it twice.
+    """
+    config = await asyncio.to_thread(load_smtp_config)
+    async with _SMTP_LOCK:
+        try:
+            await asyncio.to_thread(send_on_pooled_smtp, msg, config)
+        except Exception:
+            close_smtp()
+            raise
+
+
+atexit.register(close_smtp)
+
+
+def validate_pdf_attachment(attachment_path: str, max_bytes: int = MAX_ATTACHMENT_BYTES) -> Tuple[str, int]:
+    """Validate PDF attachment path and size, returning its filename and size in bytes."""
     try:
         if not attachment_path.endswith(".pdf"):
             raise ValueError("Attachment must be a PDF file")
@@ -50,44 +145,113 @@ def validate_pdf_attachment(attachment_path: str) -> str:
             raise FileNotFoundError(f"PDF file not found: {attachment_path}")
         if not os.access(attachment_path, os.R_OK):
             raise PermissionError(f"Cannot read PDF file: {attachment_path}")
-        logger.info(f"PDF attachment validated: {attachment_path}")
-        return os.path.basename(attachment_path)
+        size = os.path.getsize(attachment_path)
+        if size > max_bytes:
+            raise ValueError(
+                f"PDF file is {size} bytes; attachments are limited to {max_bytes} bytes")
+        logger.info("PDF attachment validated: %s", attachment_path)
+        return os.path.basename(attachment_path), size
     except Exception as e:
-        logger.error(f"Failed to validate PDF attachment: {str(e)}")
+        logger.error("Failed to validate PDF attachment: %s", e)
         raise
 
 
+def load_credentials() -> Credentials:
+    """Load OAuth2 credentials from token.json, refreshing or re-authorizing as needed."""
+    creds = None
+    if os.path.exists(TOKEN_PATH):
+        logger.info("Loading token from file")
+        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            logger.info("Refreshing token")
+            creds.refresh(Request())
+        else:
+            if not os.path.exists(CREDS_FILE_PATH):
+                raise FileNotFoundError(
+                    f"Credentials file not found: {CREDS_FILE_PATH}")
+            logger.info("Fetching new token")
+            flow = InstalledAppFlow.from_client_secrets_file(
+                CREDS_FILE_PATH, SCOPES)
+            creds = flow.run_local_server(port=0)
+            with open(TOKEN_PATH, "w") as token_file:
+                token_file.write(creds.to_json())
+            logger.info("Token saved to %s", TOKEN_PATH)
+            os.chmod(TOKEN_PATH, 0o600)
+    return creds
+
+
+def get_thread_http() -> google_auth_httplib2.AuthorizedHttp:
+    """Return the calling thread's authorized HTTP connection for the current credentials."""
+    http = getattr(_THREAD_HTTP, "http", None)
+    if http is None or http.credentials is not _CREDENTIALS:
+        http = google_auth_httplib2.AuthorizedHttp(
+            _CREDENTIALS, http=httplib2.Http())
+        _THREAD_HTTP.http = http
+    return http
+
+
+class ThreadLocalHttpRequest(HttpRequest):
+    """HttpRequest that always executes on the executing thread's connection.
+
+    Requests are built on the event loop thread but executed in worker threads
+    (including inside batch requests), so the connection is looked up when it
+    is used rather than when the request is built.
+    """
+
+    @property
+    def http(self) -> google_auth_httplib2.AuthorizedHttp:
+        return get_thread_http()
+
+    @http.setter
+    def http(self, value: Any) -> None:
+        pass
+
+
+def build_request(http: Any, *args: Any, **kwargs: Any) -> HttpRequest:
+    """requestBuilder for the Gmail service."""
+    return ThreadLocalHttpRequest(http, *args, **kwargs)
+
+
 def get_gmail_service() -> Any:
-    """Initialize Gmail API service with OAuth2 credentials."""
-    try:
-        creds = None
-        if os.path.exists(TOKEN_PATH):
-            logger.info("Loading token from file")
-            creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
-
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                logger.info("Refreshing token")
-                creds.refresh(Request())
-            else:
-                if not os.path.exists(CREDS_FILE_PATH):
-                    raise FileNotFoundError(
-                        f"Credentials file not found: {CREDS_FILE_PATH}")
-                logger.info("Fetching new token")
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    CREDS_FILE_PATH, SCOPES)
-                creds = flow.run_local_server(port=0)
-                with open(TOKEN_PATH, "w") as token_file:
-                    token_file.write(creds.to_json())
-                logger.info(f"Token saved to {TOKEN_PATH}")
-                os.chmod(TOKEN_PATH, 0o600)
-
-        service = build("gmail", "v1", credentials=creds)
-        logger.info("Gmail service initialized")
+    """Return the Gmail API service, building it once with OAuth2 credentials."""
+    global _SERVICE, _CREDENTIALS
+    service = _SERVICE
+    if service is not None:
         return service
-    except Exception as e:
-        logger.error(f"Failed to initialize Gmail service: {str(e)}")
-        raise
+    with _SERVICE_LOCK:
+        if _SERVICE is not None:
+            return _SERVICE
+        try:
+            _CREDENTIALS = load_credentials()
+            _SERVICE = build("gmail", "v1", credentials=_CREDENTIALS,
+                             cache_discovery=False, static_discovery=True,
+                             requestBuilder=build_request)
+            logger.info("Gmail service initialized")
+            return _SERVICE
+        except Exception as e:
+            logger.error("Failed to initialize Gmail service: %s", e)
+            raise
+
+
+async def get_gmail_service_async() -> Any:
+    """Return the Gmail API service, building it in a worker thread on first use.
+
+    Loading credentials reads token.json and may refresh the token over the
+    network, so the first call keeps that off the event loop.
+    """
+    service = _SERVICE
+    if service is not None:
+        return service
+    return await asyncio.to_thread(get_gmail_service)
+
+
+def reset_gmail_service() -> None:
+    """Drop the cached service so the next call reloads credentials."""
+    global _SERVICE
+    with _SERVICE_LOCK:
+        _SERVICE = None
 
 
 def get_user_email(service: Any) -> str:
@@ -95,14 +259,16 @@ def get_user_email(service: Any) -> str:
     try:
         profile = service.users().getProfile(userId="me").execute()
         user_email = profile.get("emailAddress", "")
-        logger.info(f"User email retrieved: {user_email}")
+        logger.info("User email retrieved: %s", user_email)
         return user_email
     except HttpError as e:
-        logger.error(f"Failed to get user email: {str(e)}")
+        logger.error("Failed to get user email: %s", e)
         raise
 
 
 def handle_gmail_error(e: Exception) -> Dict[str, Any]:
     """Handle Gmail API errors and return JSON-serializable error response."""
-    logger.error(f"Gmail API error: {str(e)}")
+    logger.error("Gmail API error: %s", e)
+    if isinstance(e, HttpError) and getattr(e.resp, "status", None) == 401:
+        reset_gmail_service()
     return {"error": str(e)}
@@ -0,0 +1,67 @@
+import asyncio
+import secrets
+import time
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+# Seconds a tool waits for its job before handing back a job id instead
+INLINE_WAIT = 5.0
+# Seconds a finished job's result is kept for poll_job
+JOB_RETENTION = 600
+
+
+class JobManager:
+    """
+    Run long tool operations as background tasks that clients can poll.
+
+    A job that finishes within the inline wait is answered directly; otherwise
+    the caller gets a job id and collects the result later with poll().
+    """
+
+    def __init__(self, inline_wait: float = INLINE_WAIT, retention: float = JOB_RETENTION):
+        self.inline_wait = inline_wait
+        self.retention = retention
+        self._jobs: Dict[str, Tuple[asyncio.Task, Optional[float]]] = {}
+
+    def _prune(self) -> None:
+        """Forget finished jobs that have not been polled within the retention period."""
+        cutoff = time.monotonic() - self.retention
+        for job_id, (task, finished_at) in list(self._jobs.items()):
+            if finished_at is not None and finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def _mark_finished(self, job_id: str) -> None:
+        if job_id in self._jobs:
+            self._jobs[job_id] = (self._jobs[job_id][0], time.monotonic())
+
+    async def run(self, coro: Awaitable[Any]) -> Tuple[Optional[str], Any]:
+        """
+        Start coro and wait briefly for it.
+
+        Returns:
+            Tuple[Optional[str], Any]: (None, result) if the job finished in time,
+            otherwise (job_id, None). Exceptions raised by a job that finishes in
+            time propagate to the caller.
+        """
+        self._prune()
+        task = asyncio.ensure_future(coro)
+        done, _ = await asyncio.wait({task}, timeout=self.inline_wait)
+        if done:
+            return None, task.result()
+        job_id = secrets.token_hex(8)
+        self._jobs[job_id] = (task, None)
+        task.add_done_callback(lambda _: self._mark_finished(job_id))
+        return job_id, None
+
+    def poll(self, job_id: str) -> Dict[str, Any]:
+        """Return the job's status, and its result or error once it has finished."""
+        if job_id not in self._jobs:
+            return {"error": f"Unknown job id: {job_id}"}
+        task, _ = self._jobs[job_id]
+        if not task.done():
+            return {"job_id": job_id, "status": "pending"}
+        del self._jobs[job_id]
+        if task.cancelled():
+            return {"job_id": job_id, "status": "error", "error": "Job was cancelled"}
+        if task.exception() is not None:
+            return {"job_id": job_id, "status": "error", "error": str(task.exception())}
+        return {"job_id": job_id, "status": "done", "result": task.result()}
@@ -1,19 +1,15 @@
 from fastmcp import FastMCP
 import sqlite3
+import atexit
+import threading
 from contextlib import closing
 from pathlib import Path
-import json
-import logging
+import orjson
 from config.config_loader import load_mcp_config
+from config.logging_config import get_file_logger
 
 # Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filename="/mnt/d/linux/TheMCP/servers/sqlite/sqlite-mcp.log",
-    filemode="a"
-)
-logger = logging.getLogger("mcp_server_sqlite")
+logger = get_file_logger("mcp_server_sqlite", "/mnt/d/linux/TheMCP/servers/sqlite/sqlite-mcp.log")
 
 # Load configuration
 try:
@@ -29,137 +25,269 @@ try:
     PORT = server_config.get("port")
     DB_PATH = server_config["dbPath"]
 except Exception as e:
-    logger.error(f"Failed to load configuration: {str(e)}")
+    logger.error("Failed to load configuration: %s", e)
     raise
 
 
+# Rows fetched per batch when streaming read results
+FETCH_SIZE = 1000
+
+# Authorizer actions a read-only statement may perform
+READ_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ,
+                sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+# Authorizer actions write_query refuses: they would leave the shared
+# connection inside a transaction, attached to another database, or with
+# changed settings for every later call
+CONNECTION_STATE_ACTIONS = {sqlite3.SQLITE_TRANSACTION, sqlite3.SQLITE_SAVEPOINT,
+                            sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH}
+# Pragmas that only report schema information (used by describe_table)
+READ_PRAGMAS = {"table_info", "table_xinfo", "table_list", "index_list",
+                "index_info", "index_xinfo", "foreign_key_list"}
+
+
+def read_only_authorizer(action: int, arg1: str | None, arg2: str | None, db_name: str | None, trigger: str | None) -> int:
+    """sqlite3 authorizer that rejects any statement which writes or changes state."""
+    if action in READ_ACTIONS:
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_PRAGMA and arg1 in READ_PRAGMAS:
+        return sqlite3.SQLITE_OK
+    # The first use of a pragma table-valued function registers it in the schema
+    if action == sqlite3.SQLITE_UPDATE and arg1 == "sqlite_master":
+        return sqlite3.SQLITE_OK
+    return sqlite3.SQLITE_DENY
+
+
 class SqliteDatabase:
     def __init__(self, db_path: str):
         self.db_path = str(Path(db_path).expanduser())
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # One connection for the process; tools may run on worker threads, so
+        # every use of it goes through the lock
+        self._lock = threading.Lock()
+        self._conn = None
         self._init_database()
 
     def _init_database(self):
-        """Initialize connection to the SQLite database."""
+        """Open the shared connection to the SQLite database in WAL mode."""
         logger.debug("Initializing database connection")
-        with closing(sqlite3.connect(self.db_path)) as conn:
-            conn.row_factory = sqlite3.Row
-            conn.close()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+        """)
+        atexit.register(self.close)
 
-    def _execute_query(self, query: str, params: dict[str, any] | None = None) -> list[dict[str, any]]:
-        """Execute a SQL query and return results as a list of dictionaries."""
-        logger.debug(f"Executing query: {query}")
+    def _query_json(self, query: str, params: dict[str, any] | tuple | None = None) -> str:
+        """Execute a read query and serialize its rows straight into a JSON array."""
+        logger.debug("Executing query: %s", query)
         try:
-            with closing(sqlite3.connect(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                with closing(conn.cursor()) as cursor:
-                    if params:
-                        cursor.execute(query, params)
-                    else:
-                        cursor.execute(query)
-
-                    if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER')):
-                        conn.commit()
-                        affected = cursor.rowcount
-                        logger.debug(f"Write query affected {affected} rows")
-                        return [{"affected_rows": affected}]
-
-                    results = [dict(row) for row in cursor.fetchall()]
-                    logger.debug(f"Read query returned {len(results)} rows")
-                    return results
+            with self._lock, closing(self._conn.cursor()) as cursor:
+                cursor.arraysize = FETCH_SIZE
+                # Plain tuples are zipped with the column names below, which
+                # is cheaper than building sqlite3.Row objects per row
+                cursor.row_factory = None
+                # SQLite refuses to prepare anything that writes
+                self._conn.set_authorizer(read_only_authorizer)
+                try:
+                    cursor.execute(query, params or ())
+                finally:
+                    self._conn.set_authorizer(None)
+                    self._rollback_open_transaction()
+                if cursor.description is None:
+                    # Empty or comment-only query: nothing was run
+                    return "[]"
+                columns = [column[0] for column in cursor.description]
+                out = bytearray(b"[")
+                count = 0
+                # Each batch is encoded in one orjson call and spliced in
+                # without its enclosing brackets
+                while rows := cursor.fetchmany():
+                    if count:
+                        out += b","
+                    out += orjson.dumps([dict(zip(columns, row))
+                                        for row in rows])[1:-1]
+                    count += len(rows)
+                out += b"]"
+            logger.debug("Read query returned %s rows", count)
+            return out.decode()
         except Exception as e:
-            logger.error(f"Database error executing query: {e}")
+            logger.error("Database error executing query: %s", e)
             raise
 
+    def add_candidate_asset(self, name: str, asset: str) -> bool | None:
+        """
+        Append an asset to the named candidate's comma-separated physical_assets.
+
+        Returns True if it was added, False if it was already listed, and None
+        if no candidate has that name. The membership check and the append are
+        a single UPDATE, so concurrent calls cannot add the same asset twice.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE candidates SET physical_assets = CASE "
+                "WHEN physical_assets IS NULL OR physical_assets = '' THEN :asset "
+                "ELSE physical_assets || ',' || :asset END "
+                "WHERE name = :name AND instr(',' || IFNULL(physical_assets, '') || ',', ',' || :asset || ',') = 0",
+                {"asset": asset, "name": name})
+            if cursor.rowcount > 0:
+                return True
+            exists = self._conn.execute(
+                "SELECT 1 FROM candidates WHERE name = ?", (name,)).fetchone() is not None
+        return False if exists else None
+
+    def _rollback_open_transaction(self):
+        """Roll back a transaction a tool call left open on the shared connection. Call with the lock held."""
+        if self._conn.in_transaction:
+            logger.warning("Rolling back a transaction left open by a query")
+            self._conn.execute("ROLLBACK")
+
+    def close(self):
+        """Close the shared connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _execute_query(self, query: str, params: dict[str, any] | tuple | None = None) -> list[dict[str, any]]:
+        """
+        Execute a SQL statement that changes the database.
+
+        Statements that only read are rejected with ValueError; use
+        _query_json for those, and so are transaction control, ATTACH, DETACH
+        and pragma settings, which would change the shared connection for
+        later calls. Returns the affected row count, or the rows for
+        statements with a RETURNING clause.
+        """
+        logger.debug("Executing query: %s", query)
+        writes = []
+
+        def record_writes(action: int, arg1: str | None, arg2: str | None, *args: any) -> int:
+            if action in CONNECTION_STATE_ACTIONS:
+                return sqlite3.SQLITE_DENY
+            if action == sqlite3.SQLITE_PRAGMA:
+                # Reading a pragma is not a write; setting one (PRAGMA name =
+                # value) changes the connection
+                if arg2 is None or arg1 in READ_PRAGMAS:
+                    return sqlite3.SQLITE_OK
+                return sqlite3.SQLITE_DENY
+            if action not in READ_ACTIONS:
+                writes.append(action)
+            return sqlite3.SQLITE_OK
+        try:
+            with self._lock, closing(self._conn.cursor()) as cursor:
+                self._conn.set_authorizer(record_writes)
+                try:
+                    cursor.execute(query, params or ())
+                finally:
+                    self._conn.set_authorizer(None)
+                    self._rollback_open_transaction()
+                if not writes:
+                    raise ValueError(
+                        "Read-only queries are not allowed for write_query; use read_query")
+
+                if cursor.description is None:
+                    # Autocommit connection: the write is already committed
+                    affected = cursor.rowcount
+                    logger.debug("Write query affected %s rows", affected)
+                    return [{"affected_rows": affected}]
+
+                results = [dict(row) for row in cursor.fetchall()]
+                logger.debug("Query returned %s rows", len(results))
+                return results
+        except Exception as e:
+            logger.error("Database error executing query: %s", e)
+            raise
+
+
+def to_json(obj: any) -> str:
+    """Serialize a tool response compactly with orjson; FastMCP tools return str."""
+    return orjson.dumps(obj).decode()
+
+
+# Fixed statements, kept as constants so the connection's statement cache
+# reuses their compiled form
+LIST_TABLES_SQL = "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
+DESCRIBE_TABLE_SQL = 'SELECT cid, name, type, "notnull", dflt_value, pk FROM pragma_table_info(?)'
 
 # Initialize the MCP server
 mcp = FastMCP(SERVER_NAME)
 db = SqliteDatabase(DB_PATH)
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 def read_query(query: str) -> str:
     """Execute a SELECT query on the candidates database and return results as JSON."""
-    if not query.strip().upper().startswith("SELECT"):
-        return json.dumps({"error": "Only SELECT queries are allowed for read_query"})
     try:
-        results = db._execute_query(query)
-        return json.dumps(results, indent=2)
+        return db._query_json(query)
+    except sqlite3.DatabaseError as e:
+        if str(e) == "not authorized":
+            return to_json({"error": "Only read-only queries are allowed for read_query"})
+        return to_json({"error": str(e)})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 def write_query(query: str) -> str:
     """Execute an INSERT, UPDATE, or DELETE query on the candidates database."""
-    if query.strip().upper().startswith("SELECT"):
-        return json.dumps({"error": "SELECT queries are not allowed for write_query"})
     try:
         results = db._execute_query(query)
-        return json.dumps(results, indent=2)
+        return to_json(results)
+    except sqlite3.DatabaseError as e:
+        if str(e) == "not authorized":
+            return to_json({"error": "Transactions, ATTACH, DETACH and pragma settings are not allowed for write_query"})
+        return to_json({"error": str(e)})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 def list_tables() -> str:
     """List all tables and views in the SQLite database."""
     try:
-        results = db._execute_query(
-            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")
-        return json.dumps(results, indent=2)
+        return db._query_json(LIST_TABLES_SQL)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 def describe_table(table_name: str) -> str:
     """Get the schema information for a specific table or view."""
     try:
-        results = db._execute_query(f"PRAGMA table_info({table_name})")
-        return json.dumps(results, indent=2)
+        return db._query_json(DESCRIBE_TABLE_SQL, (table_name,))
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 def update_candidate_asset(name: str, asset: str) -> str:
     """Add a physical asset to a candidate in the database."""
     try:
-        with closing(sqlite3.connect(DB_PATH)) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT physical_assets FROM candidates WHERE name = ?", (name,))
-            row = cursor.fetchone()
-            if not row:
-                conn.close()
-                return json.dumps({"error": f"Candidate {name} not found"})
-
-            physical_assets = row[0].split(",") if row[0] else []
-            if asset not in physical_assets:
-                physical_assets.append(asset)
-                cursor.execute("UPDATE candidates SET physical_assets = ? WHERE name = ?",
-                               (",".join(physical_assets), name))
-                conn.commit()
-                conn.close()
-                return json.dumps({"message": f"Added {asset} to {name}'s physical assets"})
-            conn.close()
-            return json.dumps({"message": f"{asset} already assigned to {name}"})
+        added = db.add_candidate_asset(name, asset)
+        if added is None:
+            return to_json({"error": f"Candidate {name} not found"})
+        if added:
+            return to_json({"message": f"Added {asset} to {name}'s physical assets"})
+        return to_json({"message": f"{asset} already assigned to {name}"})
     except Exception as e:
-        return json.dumps({"error": f"Error updating asset: {str(e)}"})
+        return to_json({"error": f"Error updating asset: {str(e)}"})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 def query_candidate_salary(name: str) -> str:
     """Query the candidate_salary_view for a candidate's details and salary structure."""
     try:
-        results = db._execute_query(
-            "SELECT * FROM candidate_salary_view WHERE name = ?", {"name": name})
-        return json.dumps(results, indent=2)
+        return db._query_json(
+            "SELECT * FROM candidate_salary_view WHERE name = :name", {"name": name})
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return to_json({"error": str(e)})
 
 
 if __name__ == "__main__":
-    logger.info(f"Starting {SERVER_NAME} on http://localhost:{PORT}")
+    logger.info("Starting %s on http://localhost:%s", SERVER_NAME, PORT)
     mcp.run(transport="http", port=PORT, host="0.0.0.0")
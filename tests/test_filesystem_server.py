@@ -0,0 +1,109 @@
+import asyncio
+import importlib
+import logging
+import sys
+
+import orjson
+import pytest
+
+import config.config_loader
+import config.logging_config
+
+MODULE = "servers.filesystem.filesystem_mcp"
+
+
+@pytest.fixture
+def filesystem_server(tmp_path, monkeypatch):
+    """Import the filesystem server with tmp_path as its allowed directory."""
+    monkeypatch.setattr(config.config_loader, "load_mcp_config", lambda: {
+        "mcpServers": {"filesystem-server": {
+            "allowedDir": str(tmp_path), "serverName": "test", "port": 0}}})
+    monkeypatch.setattr(config.logging_config, "get_file_logger",
+                        lambda name, filename, level=None: logging.getLogger(name))
+    sys.modules.pop(MODULE, None)
+    yield importlib.import_module(MODULE)
+    sys.modules.pop(MODULE, None)
+
+
+def readlines_tail(file_path, num_lines):
+    """The line-based tail the mmap version must reproduce."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()[-num_lines:]
+    return "\n".join(line.rstrip("\n") for line in lines)
+
+
+@pytest.mark.parametrize("content", [
+    "a\n\n", "\n\n\n", "a\nb", "a\nb\n", "a\n\n\nb\n\n", "\n", "x\r\ny\r\n\r\n", "only",
+])
+@pytest.mark.parametrize("num_lines", [1, 2, 3, 5])
+def test_read_tail_matches_readlines(filesystem_server, tmp_path, content, num_lines):
+    file_path = tmp_path / "tail.txt"
+    file_path.write_bytes(content.encode("utf-8"))
+    assert filesystem_server.read_tail(str(file_path), num_lines) == readlines_tail(file_path, num_lines)
+
+
+def test_large_edit_runs_as_job(filesystem_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(filesystem_server.jobs, "inline_wait", 0.0)
+    file_path = tmp_path / "large.txt"
+    lines = [f"line {i}" for i in range(200_000)]
+    file_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    assert file_path.stat().st_size > filesystem_server.LARGE_EDIT_BYTES
+    edit_file = getattr(filesystem_server.edit_file, "fn", filesystem_server.edit_file)
+    poll_job = getattr(filesystem_server.poll_job, "fn", filesystem_server.poll_job)
+
+    async def run():
+        started = orjson.loads(await edit_file({
+            "path": str(file_path),
+            "edits": [{"oldText": "line 199999", "newText": "last line"}],
+            "dryRun": True}))
+        assert started["status"] == "pending"
+        while True:
+            status = orjson.loads(await poll_job({"job_id": started["job_id"]}))
+            if status["status"] != "pending":
+                return status
+            await asyncio.sleep(0.01)
+
+    status = asyncio.run(run())
+    assert status["status"] == "done"
+    assert "+last line" in status["content"]
+    assert file_path.read_text(encoding="utf-8").endswith("line 199999\n")
+
+
+def test_dependent_edits_apply_in_order(filesystem_server, tmp_path):
+    # The first replacement creates an earlier "ab" than the one in the
+    # original text, so the second edit must see the first one's result
+    edits = [filesystem_server.EditOperation(oldText="x", newText="a"),
+             filesystem_server.EditOperation(oldText="ab", newText="Q")]
+    assert filesystem_server.splice_edits("xb ab", edits) is None
+    file_path = tmp_path / "edit.txt"
+    file_path.write_text("xb ab", encoding="utf-8")
+    filesystem_server.edit_file_contents(str(file_path), edits)
+    assert file_path.read_text(encoding="utf-8") == "Q ab"
+
+
+def test_fuzzy_edit_match_is_applied_sequentially(filesystem_server):
+    # Only the whitespace-tolerant match finds "b  ", so splicing is skipped
+    edits = [filesystem_server.EditOperation(oldText="a", newText="c"),
+             filesystem_server.EditOperation(oldText="b  ", newText="d")]
+    assert filesystem_server.splice_edits("a\n    b\n", edits) is None
+
+
+def test_search_pattern_is_a_substring(filesystem_server, tmp_path):
+    (tmp_path / "report[1].txt").write_text("", encoding="utf-8")
+    (tmp_path / "notes.py").write_text("", encoding="utf-8")
+    (tmp_path / "skip").mkdir()
+    (tmp_path / "skip" / "Report[1].md").write_text("", encoding="utf-8")
+    results = filesystem_server.search_directory(str(tmp_path), "report[1]", ["skip/*"])
+    assert results == [str(tmp_path / "report[1].txt")]
+    assert filesystem_server.search_directory(str(tmp_path), "*.py") == []
+
+
+def test_directory_tree_labels_symlinked_directories(filesystem_server, tmp_path):
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "a.txt").write_text("", encoding="utf-8")
+    (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+    directory_tree = getattr(filesystem_server.directory_tree, "fn", filesystem_server.directory_tree)
+    result = orjson.loads(asyncio.run(directory_tree({"path": str(tmp_path)})))
+    tree = {entry["name"]: entry for entry in orjson.loads(result["content"])}
+    assert tree["link"] == {"name": "link", "type": "directory"}
+    assert tree["real"]["children"] == [{"name": "a.txt", "type": "file"}]
@@ -0,0 +1,85 @@
+import importlib
+import logging
+import sqlite3
+import sys
+
+import orjson
+import pytest
+
+import config.config_loader
+import config.logging_config
+
+MODULE = "servers.sqlite.mcp_server_sqlite"
+
+
+def tool(fn):
+    """Return the plain function behind a FastMCP tool."""
+    return getattr(fn, "fn", fn)
+
+
+@pytest.fixture
+def sqlite_server(tmp_path, monkeypatch):
+    """Import the SQLite server against a small throwaway database."""
+    db_path = tmp_path / "candidates.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE candidates (id INTEGER PRIMARY KEY, name TEXT, physical_assets TEXT)")
+        conn.execute(
+            "INSERT INTO candidates (name, physical_assets) VALUES ('Ada', 'laptop')")
+    monkeypatch.setattr(config.config_loader, "load_mcp_config", lambda: {
+        "mcpServers": {"sqlite-server": {"serverName": "test", "dbPath": str(db_path)}}})
+    monkeypatch.setattr(config.logging_config, "get_file_logger",
+                        lambda name, filename, level=None: logging.getLogger(name))
+    sys.modules.pop(MODULE, None)
+    server = importlib.import_module(MODULE)
+    yield server
+    server.db.close()
+    sys.modules.pop(MODULE, None)
+
+
+def test_write_query_rejects_transaction_control(sqlite_server):
+    result = orjson.loads(tool(sqlite_server.write_query)("BEGIN"))
+    assert "error" in result
+    assert not sqlite_server.db._conn.in_transaction
+
+
+def test_write_after_rejected_begin_is_committed(sqlite_server):
+    tool(sqlite_server.write_query)("BEGIN")
+    result = orjson.loads(tool(sqlite_server.write_query)(
+        "UPDATE candidates SET physical_assets = 'monitor' WHERE name = 'Ada'"))
+    assert result == [{"affected_rows": 1}]
+    with sqlite3.connect(sqlite_server.DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT physical_assets FROM candidates WHERE name = 'Ada'").fetchone()
+    assert row == ("monitor",)
+    result = orjson.loads(tool(sqlite_server.update_candidate_asset)("Ada", "keyboard"))
+    assert "error" not in result
+
+
+def test_read_query_rejects_writes(sqlite_server):
+    result = orjson.loads(tool(sqlite_server.read_query)("DELETE FROM candidates"))
+    assert "error" in result
+    assert orjson.loads(tool(sqlite_server.read_query)(
+        "WITH c AS (SELECT name FROM candidates) SELECT name FROM c")) == [{"name": "Ada"}]
+
+
+def test_startup_keeps_existing_tables(sqlite_server, tmp_path):
+    db_path = tmp_path / "other.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE candidate_assets (candidate_id INTEGER, asset TEXT)")
+    sqlite_server.SqliteDatabase(str(db_path)).close()
+    with sqlite3.connect(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "candidate_assets" in tables
+
+
+def test_write_query_rejects_pragma_reads(sqlite_server):
+    result = orjson.loads(tool(sqlite_server.write_query)("PRAGMA user_version"))
+    assert "error" in result
+    result = orjson.loads(tool(sqlite_server.write_query)("PRAGMA table_info(candidates)"))
+    assert "error" in result
+
+
+@pytest.mark.parametrize("query", ["", "-- nothing to run", "/* comment */"])
+def test_read_query_without_statement_returns_no_rows(sqlite_server, query):
+    assert orjson.loads(tool(sqlite_server.read_query)(query)) == []